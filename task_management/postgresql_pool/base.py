@@ -0,0 +1,82 @@
+"""
+PostgreSQL backend that checks connections out of an in-process pool.
+
+Django opens a connection per thread and closes it at the end of each
+request when CONN_MAX_AGE is 0; with this backend "opening" takes one from
+the pool and "closing" returns it, so a request only pays the TCP and
+authentication handshake when the pool has to grow. Configure the pool with
+a POOL dict in the DATABASES entry (see ConnectionPool for the keys).
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base, creation
+
+from .pool import ConnectionPool
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_pool(alias):
+    """The current process's pool for `alias`, or None until its first connection."""
+    pool = _pools.get(alias)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    return None
+
+
+def close_pool(alias):
+    """Close the idle connections of `alias` and forget its pool."""
+    with _lock:
+        pool = _pools.pop(alias, None)
+    if pool is not None and pool.pid == os.getpid():
+        pool.close()
+
+
+def pool_stats():
+    """{alias: stats} for the pools this process has opened."""
+    return {alias: pool.stats() for alias in list(_pools) if (pool := get_pool(alias)) is not None}
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Pooled connections would keep the test database in use
+        close_pool(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        pool = get_pool(self.alias)
+        if pool is not None and pool.conn_params != conn_params:
+            # The settings changed, e.g. the test runner switched to the test database
+            close_pool(self.alias)
+            pool = None
+        if pool is None:
+            with _lock:
+                pool = get_pool(self.alias)
+                if pool is None:
+                    # A forked worker starts its own pool rather than sharing the parent's sockets
+                    pool = _pools[self.alias] = ConnectionPool(
+                        lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                        **self.settings_dict.get('POOL', {}),
+                    )
+                    pool.conn_params = conn_params
+        return pool
+
+    def get_new_connection(self, conn_params):
+        # The pooled connection may have been opened by another thread's wrapper
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = base.IsolationLevel(isolation_level or base.IsolationLevel.READ_COMMITTED)
+        return self.get_pool(conn_params).getconn()
+
+    def _close(self):
+        if self.connection is not None:
+            pool = get_pool(self.alias)
+            if pool is None:
+                return super()._close()
+            with self.wrap_database_errors:
+                pool.putconn(self.connection)
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of DB-API connections for one database, in one process.
+
+    Up to `max_size` connections are opened on demand; a caller finding them
+    all checked out waits up to `timeout` seconds. Idle connections above
+    `min_size` are closed after `max_idle` seconds, and every connection is
+    replaced after `max_lifetime`. A connection idle for more than
+    `check_after` seconds is pinged before it is handed out, so one the
+    server or a proxy dropped is replaced instead of failing the request.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=10,
+                 max_idle=300, max_lifetime=3600, check_after=30):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self.pid = os.getpid()
+        self.condition = threading.Condition()
+        self.idle = deque()  # (connection, returned_at), most recently returned last
+        self.opened_at = {}  # id(connection) -> monotonic time it was opened
+        self.size = 0
+        self.counters = dict.fromkeys((
+            'checkouts', 'waits', 'timeouts', 'connections_opened', 'connections_closed',
+            'health_check_failures',
+        ), 0)
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def getconn(self):
+        started = None
+        with self.condition:
+            while True:
+                self.close_expired()
+                if self.idle:
+                    connection, returned_at = self.idle.pop()
+                    break
+                if self.size < self.max_size:
+                    self.size += 1
+                    connection = None
+                    break
+                if started is None:
+                    started = time.monotonic()
+                    self.counters['waits'] += 1
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0 or not self.condition.wait(remaining):
+                    if not self.idle and self.size >= self.max_size:
+                        self.counters['timeouts'] += 1
+                        self.record_wait(started)
+                        raise PoolTimeout(
+                            f'No database connection available within {self.timeout}s '
+                            f'({self.max_size} in use).'
+                        )
+            self.counters['checkouts'] += 1
+            if started is not None:
+                self.record_wait(started)
+
+        if connection is None:
+            return self.open()
+        if time.monotonic() - returned_at > self.check_after and not self.is_usable(connection):
+            # Replace it in the same slot
+            with self.condition:
+                self.counters['health_check_failures'] += 1
+                self.forget(connection)
+            return self.open()
+        return connection
+
+    def putconn(self, connection):
+        """Return a connection; anything left mid-transaction is rolled back, broken ones are dropped."""
+        try:
+            if connection.closed:
+                raise OperationalError
+            if connection.get_transaction_status() != 0:  # TRANSACTION_STATUS_IDLE
+                connection.rollback()
+        except Exception:
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def open(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.opened_at[id(connection)] = time.monotonic()
+            self.counters['connections_opened'] += 1
+        return connection
+
+    def discard(self, connection):
+        with self.condition:
+            self.forget(connection)
+            self.size -= 1
+            self.condition.notify()
+
+    def forget(self, connection):
+        """Close a connection that is no longer pooled. Holds the lock."""
+        try:
+            connection.close()
+        except Exception:
+            pass
+        self.opened_at.pop(id(connection), None)
+        self.counters['connections_closed'] += 1
+
+    def close_expired(self):
+        """Close idle connections past max_idle (above min_size) or max_lifetime. Holds the lock."""
+        now = time.monotonic()
+        keep = deque()
+        for connection, returned_at in self.idle:
+            too_old = now - self.opened_at.get(id(connection), now) > self.max_lifetime
+            too_idle = now - returned_at > self.max_idle and self.size > self.min_size
+            if too_old or too_idle:
+                self.forget(connection)
+                self.size -= 1
+            else:
+                keep.append((connection, returned_at))
+        self.idle = keep
+
+    def is_usable(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def record_wait(self, started):
+        waited = time.monotonic() - started
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def close(self):
+        with self.condition:
+            idle, self.idle = self.idle, deque()
+        for connection, _ in idle:
+            self.discard(connection)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'pid': self.pid,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self.size,
+                'idle': len(self.idle),
+                'in_use': self.size - len(self.idle),
+                **self.counters,
+                'wait_ms_total': round(self.wait_seconds * 1000, 1),
+                'wait_ms_max': round(self.max_wait_seconds * 1000, 1),
+            }
@@ -0,0 +1,25 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson.
+
+    Renders the same bytes as DRF's renderer with the default settings:
+    compact separators, unescaped unicode, U+2028/U+2029 escaped, and dates,
+    times, decimals and everything else orjson does not handle identically
+    passed to DRF's encoder. Indented or ASCII-only output falls back to
+    DRF's renderer.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        rendered = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        return rendered.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
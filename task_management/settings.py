@@ -21,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -67,9 +68,30 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'password'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5433'),
+        # Keep connections open across requests, checking them before reuse
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# In-process connection pool, sized per worker process: every thread (or, under
+# ASGI, every concurrent request) of a worker needs a connection, and workers
+# x DB_POOL_MAX_SIZE must stay below the server's max_connections.
+if os.getenv('DB_POOL', 'False').lower() == 'true':
+    DATABASES['default'].update({
+        'ENGINE': 'task_management.postgresql_pool',
+        # Connections go back to the pool at the end of each request
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+            'check_after': float(os.getenv('DB_POOL_CHECK_AFTER', '30')),
+        },
+    })
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -92,11 +114,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'task_management.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'task_management.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'EXCEPTION_HANDLER': 'task_management.error_handlers.custom_exception_handler',
 }
 
@@ -114,6 +145,66 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+# Cache shared by every web and events process, e.g. redis://redis:6379/0.
+# Without it each process gets its own local-memory cache and never sees the
+# invalidations made by the others, so the cross-request caches below are off
+# by default unless REDIS_URL is set.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Seconds an authenticated user's row is cached across requests; 0 disables.
+# Saves, deletes and users.authentication.deactivate_users() invalidate it, in
+# every process only with the shared cache.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '60' if REDIS_URL else '0'))
+
+# Seconds a user's {board_id: role} map is cached across requests; 0 disables.
+# Permission checks trust the map, so it needs the shared cache.
+BOARD_ROLES_CACHE_TIMEOUT = int(os.getenv('BOARD_ROLES_CACHE_TIMEOUT', '300' if REDIS_URL else '0'))
+
+# Seconds board list and detail responses are cached. Entries are keyed by
+# per-user and per-board versions that signals bump on every relevant change,
+# so the timeout only bounds memory, as long as every process bumps the same
+# versions: it needs the shared cache. 0 disables.
+BOARD_RESPONSE_CACHE_TIMEOUT = int(os.getenv('BOARD_RESPONSE_CACHE_TIMEOUT', '300' if REDIS_URL else '0'))
+
+# Purge deleted boards from a background thread in the web process. The
+# purge_deleted_boards command finishes anything a crashed worker left behind.
+BOARD_PURGE_IN_PROCESS = os.getenv('BOARD_PURGE_IN_PROCESS', 'True').lower() == 'true'
+BOARD_PURGE_BATCH_SIZE = int(os.getenv('BOARD_PURGE_BATCH_SIZE', '1000'))
+
+# Delta sync re-sends the last SYNC_OVERLAP_SECONDS of changes on every round,
+# so rows committed late by long transactions are not missed. Tombstones older
+# than SYNC_TOMBSTONE_RETENTION_DAYS are pruned; older cursors get a full resync.
+SYNC_OVERLAP_SECONDS = int(os.getenv('SYNC_OVERLAP_SECONDS', '60'))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Serve the task list, calendar, board list, board tasks and my_invitations
+# with async views on the async ORM. Enable together with an ASGI server
+# (see "Deployment modes" in the README); under WSGI it only adds overhead.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False').lower() == 'true'
+
+# Kanban positions (tasks.positions): a board column is rebalanced once one of
+# its rank keys grows past TASK_POSITION_MAX_LENGTH characters, in a background
+# thread of the web process unless disabled; rebalance_task_positions finishes
+# anything left behind.
+TASK_POSITION_MAX_LENGTH = int(os.getenv('TASK_POSITION_MAX_LENGTH', '32'))
+TASK_REBALANCE_IN_PROCESS = os.getenv('TASK_REBALANCE_IN_PROCESS', 'True').lower() == 'true'
+
+# Board event streams (/api/boards/<id>/events/). The in-memory broker only
+# reaches streams served by the publishing process; use
+# tasks.events.PostgresBroker when the API and the streams run separately.
+EVENT_BROKER = os.getenv('EVENT_BROKER', 'tasks.events.InMemoryBroker')
+EVENT_STREAM_QUEUE_SIZE = int(os.getenv('EVENT_STREAM_QUEUE_SIZE', '100'))
+EVENT_STREAM_KEEPALIVE_SECONDS = int(os.getenv('EVENT_STREAM_KEEPALIVE_SECONDS', '15'))
+# Seconds a stream ticket (POST /api/boards/<id>/events/ticket/) stays valid.
+EVENT_STREAM_TICKET_SECONDS = int(os.getenv('EVENT_STREAM_TICKET_SECONDS', '30'))
+
 CORS_ALLOW_CREDENTIALS = True
 
 CORS_ALLOW_ALL_ORIGINS = True
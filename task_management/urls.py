@@ -4,10 +4,13 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import HttpResponse
 
+from .views import database_stats
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('users.urls')),
+    path('api/database/stats/', database_stats, name='database-stats'),
     path('api/', include('tasks.urls')),
     
     path('', lambda request: HttpResponse("Welcome to the Task Management API")),
@@ -0,0 +1,24 @@
+from django.conf import settings
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .postgresql_pool.base import pool_stats
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def database_stats(request):
+    """
+    Connection settings and, with DB_POOL on, the pool counters of the worker
+    process that served this request
+    """
+    return Response({
+        alias: {
+            'engine': config['ENGINE'],
+            'conn_max_age': config['CONN_MAX_AGE'],
+            'conn_health_checks': config['CONN_HEALTH_CHECKS'],
+            'pool': pool_stats().get(alias),
+        }
+        for alias, config in settings.DATABASES.items()
+    })
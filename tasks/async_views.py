@@ -0,0 +1,123 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSetMixin
+
+from .conditional import CollectionValidators
+from .response_cache import board_list_cache_key, get_cached_data, set_cached_data
+from .serializers import BoardValuesSerializer, FieldSelection, TaskSerializer, TaskValuesSerializer
+from .views import TaskViewSet, BoardViewSet
+
+
+def async_read(view_class, action=None):
+    """
+    Turn `handler(view, request, **kwargs)` into an async Django view that
+    serves one read action of a DRF view.
+
+    DRF's own authentication, permission, throttling and content negotiation
+    run first (in one sync_to_async call, as authentication may load the user
+    from the database); the handler then evaluates its querysets with the
+    async ORM, reusing the view's get_queryset() and serializers, and the
+    response is finalized exactly as DRF would, so the output is identical to
+    the sync action's.
+    """
+    def decorator(handler):
+        @csrf_exempt
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            self = view_class()
+            if issubclass(view_class, ViewSetMixin):
+                self.action_map = {'get': action, 'head': action}
+            self.args, self.kwargs = args, kwargs
+            self.request = request = self.initialize_request(request, *args, **kwargs)
+            self.headers = self.default_response_headers
+            try:
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+                response = await handler(self, request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+            return self.finalize_response(request, response, *args, **kwargs)
+        return view
+    return decorator
+
+
+def read_async(async_view, sync_view):
+    """Serve GET and HEAD with `async_view` and every other method with the sync DRF view."""
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+    return view
+
+
+async def paginated_response(view, request, queryset, paginator, serializer_context, selection=None):
+    """Async counterpart of the conditional, cursor-paginated task collections."""
+    validators = await CollectionValidators.acreate(request, queryset)
+    not_modified = validators.not_modified()
+    if not_modified is not None:
+        return not_modified
+
+    page = await paginator.apaginate_queryset(TaskValuesSerializer.values(queryset, selection), request, view=view)
+    serializer = TaskValuesSerializer(page, many=True, context=serializer_context, selection=selection)
+    # The nested users are one bulk lookup; run it like any async ORM query
+    data = await sync_to_async(lambda: serializer.data)()
+    return validators.apply(paginator.get_paginated_response(data))
+
+
+@async_read(TaskViewSet, 'list')
+async def task_list(view, request):
+    queryset = view.filter_queryset(view.get_queryset())
+    return await paginated_response(
+        view, request, queryset, view.paginator, view.get_serializer_context(), view.get_field_selection()
+    )
+
+
+@async_read(TaskViewSet, 'calendar')
+async def task_calendar(view, request):
+    # Loads the caller's board ids first (see TaskViewSet.get_calendar_tasks)
+    queryset = await sync_to_async(view.get_calendar_queryset)()
+    return await paginated_response(
+        view, request, queryset, view.paginator, view.get_serializer_context(), view.get_field_selection()
+    )
+
+
+@async_read(BoardViewSet, 'list')
+async def board_list(view, request):
+    key = await sync_to_async(board_list_cache_key)(request)
+    data = await sync_to_async(get_cached_data)(key)
+    if data is not None:
+        return Response(data)
+    selection = view.get_field_selection()
+    queryset = BoardValuesSerializer.values(view.filter_queryset(view.get_queryset()), selection)
+    boards = [board async for board in queryset]
+    serializer = BoardValuesSerializer(boards, many=True, context=view.get_serializer_context(), selection=selection)
+    response = Response(await sync_to_async(lambda: serializer.data)())
+    await sync_to_async(set_cached_data)(key, response)
+    return response
+
+
+@async_read(BoardViewSet, 'tasks')
+async def board_tasks(view, request, pk):
+    board = await view.filter_queryset(view.get_queryset()).filter(pk=pk).afirst()
+    if board is None:
+        raise Http404
+    view.check_object_permissions(request, board)
+    tasks = board.board_tasks.all()
+    return await paginated_response(
+        view, request, tasks, view.tasks_pagination_class(), {'request': request},
+        FieldSelection.from_request(request, TaskSerializer),
+    )
+
+
+# Mounted ahead of the router when ASYNC_READ_VIEWS is on
+urlpatterns = [
+    path('tasks/', read_async(task_list, TaskViewSet.as_view({'get': 'list', 'post': 'create'}))),
+    path('tasks/calendar/', read_async(task_calendar, TaskViewSet.as_view({'get': 'calendar'}))),
+    path('boards/', read_async(board_list, BoardViewSet.as_view({'get': 'list', 'post': 'create'}))),
+    path('boards/<int:pk>/tasks/', read_async(board_tasks, BoardViewSet.as_view({'get': 'tasks'}))),
+]
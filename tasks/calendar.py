@@ -0,0 +1,53 @@
+"""
+Calendar windows over `Task.span`, the days a task covers.
+
+A task is on every day from its start to its end date, both included, or on
+its one date when it has only one; tasks without dates are on no day. Windows
+are matched by overlap, so a task that starts before a month and ends in it is
+part of that month, and the GiST index on the span serves the match.
+"""
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import DateRange
+
+
+def window(start=None, end=None):
+    """The days from `start` to `end`, both included; either may be None for no bound."""
+    return DateRange(start, end, '[]')
+
+
+def overlapping(queryset, start=None, end=None):
+    """Tasks of `queryset` on at least one day from `start` to `end`."""
+    return queryset.filter(span__overlap=window(start, end))
+
+
+def on_day(queryset, day):
+    """Tasks of `queryset` on `day`."""
+    return queryset.filter(span__contains=day)
+
+
+def day_counts(queryset, start, end):
+    """
+    [(day, number of tasks on it)] for the days from `start` to `end` that
+    have tasks, in one aggregate query: the overlapping tasks are read once,
+    through the span index, and each is spread over its days in the window.
+    """
+    tasks = overlapping(queryset, start, end).order_by().values('span')
+    try:
+        sql, params = tasks.query.sql_with_params()
+    except EmptyResultSet:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT day::date, COUNT(*)
+            FROM ({sql}) AS tasks
+            CROSS JOIN LATERAL generate_series(
+                GREATEST(lower(tasks.span), %s::date), LEAST(upper(tasks.span) - 1, %s::date), interval '1 day'
+            ) AS day
+            GROUP BY day
+            ORDER BY day
+            """,
+            [*params, start, end],
+        )
+        return cursor.fetchall()
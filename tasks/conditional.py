@@ -0,0 +1,69 @@
+import hashlib
+import math
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class CollectionValidators:
+    """
+    ETag / Last-Modified validators for a task collection.
+
+    They are derived from one aggregate over the unpaginated queryset (row
+    count plus the latest task and board `updated_at`), so a poll that finds
+    nothing changed is answered with 304 Not Modified before any row is
+    serialized. The count catches deletions, which do not move `updated_at`,
+    and saving a user touches the tasks that render them (see tasks.signals).
+
+    Only a matching If-None-Match earns a 304. Last-Modified is informational:
+    whole-second HTTP dates cannot tell two writes in one second apart, nor
+    express a deletion, so If-Modified-Since alone is not trusted.
+    """
+
+    aggregates = {
+        'count': Count('pk'),
+        'task_updated': Max('updated_at'),
+        'board_updated': Max('board__updated_at'),
+    }
+
+    @staticmethod
+    def stats_queryset(queryset):
+        return queryset.model.objects.filter(pk__in=queryset.values('pk'))
+
+    def __init__(self, request, queryset, stats=None):
+        self.request = request
+        if stats is None:
+            stats = self.stats_queryset(queryset).aggregate(**self.aggregates)
+        timestamps = [ts for ts in (stats['task_updated'], stats['board_updated']) if ts is not None]
+        # HTTP dates have whole-second resolution; round up, never into the past
+        self.last_modified = math.ceil(max(timestamps).timestamp()) if timestamps else None
+
+        # The same collection renders differently per page, ordering and search.
+        fingerprint = ':'.join(str(part) for part in (
+            request.user.id,
+            request.get_full_path(),
+            stats['count'],
+            stats['task_updated'] and stats['task_updated'].isoformat(),
+            stats['board_updated'] and stats['board_updated'].isoformat(),
+        ))
+        self.etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+    @classmethod
+    async def acreate(cls, request, queryset):
+        """Build the validators with the async ORM."""
+        stats = await cls.stats_queryset(queryset).aaggregate(**cls.aggregates)
+        return cls(request, queryset, stats)
+
+    def not_modified(self):
+        """Return a 304 response if the client's copy is current, otherwise None."""
+        return get_conditional_response(self.request, etag=self.etag)
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        # Clients may keep a copy but must revalidate it on every poll.
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,55 @@
+"""
+Per-board counters: tasks by status, members and pending invitations.
+
+The counter columns of Board are kept by statement triggers on the task,
+membership and invitation tables (see migration 0011), so every write path
+counts, including bulk_create, bulk_update, queryset updates and deletes,
+COPY and raw SQL. Django never writes them (see Board.save). Drift can only
+come from outside, e.g. triggers disabled during a restore, and
+reconcile_board_counters() repairs it.
+"""
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+
+from .models import Board, BoardInvitation, BoardMembership, Task
+
+
+def _count(model, **filters):
+    rows = model.objects.filter(board=models.OuterRef('pk'), **filters).order_by().values('board')
+    return Coalesce(models.Subquery(rows.annotate(count=models.Count('pk')).values('count')), 0)
+
+
+def counted():
+    """{counter field: the value counted from the rows}, as correlated subqueries."""
+    return {
+        'todo_count': _count(Task, status='todo'),
+        'in_progress_count': _count(Task, status='in-progress'),
+        'done_count': _count(Task, status='done'),
+        'members_count': _count(BoardMembership),
+        'pending_invitations_count': _count(BoardInvitation, status='pending'),
+    }
+
+
+def drifted(boards):
+    """The ids of `boards` whose counters differ from the counted rows."""
+    annotations = {f'counted_{field}': count for field, count in counted().items()}
+    differs = models.Q()
+    for field in Board.COUNTER_FIELDS:
+        differs |= ~models.Q(**{field: models.F(f'counted_{field}')})
+    return list(boards.annotate(**annotations).filter(differs).order_by('id').values_list('id', flat=True))
+
+
+def reconcile_board_counters(boards=None, batch_size=500):
+    """
+    Recount the counters of `boards` (all by default) that drifted; return
+    the ids of the boards fixed. Each batch locks its boards before counting,
+    so writers that already counted their rows have committed, and those that
+    have not yet wait and count them on top.
+    """
+    board_ids = drifted(Board.objects.all() if boards is None else boards)
+    for start in range(0, len(board_ids), batch_size):
+        batch = board_ids[start:start + batch_size]
+        with transaction.atomic():
+            list(Board.objects.filter(id__in=batch).order_by('id').select_for_update(no_key=True).values_list('id'))
+            Board.objects.filter(id__in=batch).update(**counted())
+    return board_ids
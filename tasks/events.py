@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+import selectors
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import StreamTicket
+
+logger = logging.getLogger(__name__)
+
+_suppressed = ContextVar('events_suppressed', default=False)
+
+
+class Subscription:
+    """
+    One listener's bounded queue. publish() may run in any thread; events are
+    handed to the subscriber's event loop. A subscriber that falls more than
+    `maxsize` events behind gets `None` and should reconnect and resync.
+    """
+
+    def __init__(self, channel, maxsize):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InMemoryBroker:
+    """Fans events out to the subscribers of this process only."""
+
+    def __init__(self):
+        self.subscriptions = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self, channel):
+        """Must be called from the subscriber's event loop."""
+        subscription = Subscription(channel, settings.EVENT_STREAM_QUEUE_SIZE)
+        with self.lock:
+            self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.channel]
+
+
+class PostgresBroker(InMemoryBroker):
+    """
+    Delivers events across processes with PostgreSQL LISTEN/NOTIFY, so API
+    workers can publish to the processes holding the event streams. Each
+    subscribing process keeps one listening connection in a background
+    thread and fans notifications out locally.
+    """
+
+    notify_channel = 'board_events'
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def publish(self, channel, event):
+        payload = json.dumps({'channel': channel, 'event': event}, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.notify_channel, payload])
+
+    def subscribe(self, channel):
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name='board-events-listener', daemon=True)
+                self.listener.start()
+        return super().subscribe(channel)
+
+    def listen(self):
+        while True:
+            try:
+                # Opened directly: a pooled connection would never be returned
+                listen_connection = connection.Database.connect(**connection.get_connection_params())
+                listen_connection.autocommit = True
+                with listen_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.notify_channel}')
+                # Not select.select(): a process with thousands of streams has
+                # descriptors beyond its 1024 limit.
+                selector = selectors.DefaultSelector()
+                selector.register(listen_connection, selectors.EVENT_READ)
+                while True:
+                    if not selector.select(timeout=30):
+                        continue
+                    listen_connection.poll()
+                    while listen_connection.notifies:
+                        message = json.loads(listen_connection.notifies.pop(0).payload)
+                        super().publish(message['channel'], message['event'])
+            except Exception:
+                logger.exception('Board event listener failed, reconnecting')
+                threading.Event().wait(5)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.EVENT_BROKER)()
+
+
+@contextmanager
+def suppress_events():
+    """Publish nothing inside the block, e.g. while purging a deleted board."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def board_channel(board_id):
+    return f'board:{board_id}'
+
+
+def publish_board_event(board_id, event_type, **data):
+    """Publish an event to a board's stream once the current transaction commits."""
+    if _suppressed.get() or not board_id:
+        return
+    event = {'type': event_type, 'board_id': board_id, **data}
+    transaction.on_commit(lambda: get_broker().publish(board_channel(board_id), event))
+
+
+def task_payload(task):
+    """The task's own columns; nested owner and collaborators would cost queries per event."""
+    return {
+        'id': task.id,
+        'title': task.title,
+        'priority': task.priority,
+        'status': task.status,
+        'position': task.position,
+        'start_date': task.start_date,
+        'end_date': task.end_date,
+        'owner_id': task.owner_id,
+        'updated_at': task.updated_at,
+    }
+
+
+def publish_task_events(tasks, event_type):
+    """
+    Publish `event_type` for saved tasks. Tasks moved off a board also get a
+    task.deleted on their previous board, so call this before
+    tasks.sync.record_task_moves() resets the loaded board.
+    """
+    for task in tasks:
+        previous = getattr(task, '_loaded_board_id', None)
+        if previous is not None and previous != task.board_id:
+            publish_board_event(previous, 'task.deleted', task={'id': task.id})
+        publish_board_event(task.board_id, event_type, task=task_payload(task))
+
+
+def _ticket_key(ticket):
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+
+def issue_stream_ticket(user, board_id):
+    """
+    A ticket that opens one stream of `board_id` for `user` within
+    EVENT_STREAM_TICKET_SECONDS. Expired tickets are dropped on the way.
+    """
+    ticket = secrets.token_urlsafe(32)
+    now = timezone.now()
+    StreamTicket.objects.filter(expires_at__lte=now).delete()
+    StreamTicket.objects.create(
+        key=_ticket_key(ticket), user=user, board_id=board_id,
+        expires_at=now + timedelta(seconds=settings.EVENT_STREAM_TICKET_SECONDS),
+    )
+    return ticket
+
+
+def redeem_stream_ticket(ticket, board_id):
+    """
+    The id of the user `ticket` was issued to for `board_id`, or None when it
+    is unknown, expired or already used. Of concurrent redeemers, only the one
+    that deletes the ticket wins.
+    """
+    if not ticket:
+        return None
+    tickets = StreamTicket.objects.filter(key=_ticket_key(ticket), board_id=board_id, expires_at__gt=timezone.now())
+    found = tickets.values_list('pk', 'user_id').first()
+    if found is None or not StreamTicket.objects.filter(pk=found[0]).delete()[0]:
+        return None
+    return found[1]
+
+
+def format_event(event):
+    """Encode an event as a Server-Sent Events message."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def stream_events(broker, subscription, user_id):
+    """
+    Yield a subscription's events as SSE messages, with a comment line every
+    EVENT_STREAM_KEEPALIVE_SECONDS so proxies keep idle streams open. Ends when
+    the board is deleted, the user is removed from it or the subscriber falls
+    behind; clients then reconnect (or stop) and catch up with /api/tasks/sync/.
+    """
+    try:
+        yield ': connected\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), settings.EVENT_STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if event is None:
+                yield format_event({'type': 'stream.overflow', 'board_id': None})
+                return
+            yield format_event(event)
+            if event['type'] == 'board.deleted' or (
+                event['type'] == 'member.removed' and event['user_id'] == user_id
+            ):
+                return
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,77 @@
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from .serializers import TaskSerializer
+
+CSV_COLUMNS = [
+    'id', 'title', 'description', 'priority', 'status', 'start_date', 'end_date',
+    'created_at', 'updated_at', 'owner_email', 'collaborator_emails',
+]
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def batched_lines(lines, size=200):
+    """Join lines into larger writes so the server does not flush once per row."""
+    lines = iter(lines)
+    while batch := ''.join(islice(lines, size)):
+        yield batch
+
+
+async def aiter_chunks(chunks):
+    """
+    Serve a sync stream under ASGI, one chunk at a time. Django would read a
+    sync iterator to the end before sending the first byte; here each chunk is
+    produced in the request's sync thread, where the server-side cursor and
+    its connection live, and the stream is closed there if the client leaves.
+    """
+    chunks = iter(chunks)
+    done = object()
+    try:
+        while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def iter_tasks(queryset, chunk_size):
+    """
+    Iterate a board's tasks through a server-side cursor. Owners come from the
+    same query and collaborators are prefetched once per chunk, so memory
+    stays bounded by `chunk_size` however large the board is.
+    """
+    queryset = TaskSerializer.setup_eager_loading(queryset).order_by('id')
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def stream_ndjson(queryset, context, chunk_size):
+    """One TaskSerializer document per line, identical to the API representation."""
+    serializer = TaskSerializer(context=context)
+    yield from batched_lines(
+        json.dumps(serializer.to_representation(task), ensure_ascii=False) + '\n'
+        for task in iter_tasks(queryset, chunk_size)
+    )
+
+
+def stream_csv(queryset, chunk_size):
+    """Flat rows with the owner and collaborators identified by email."""
+    writer = csv.writer(Echo())
+    # The header goes out before the query runs
+    yield writer.writerow(CSV_COLUMNS)
+    yield from batched_lines(
+        writer.writerow([
+            task.id, task.title, task.description or '', task.priority, task.status,
+            task.start_date or '', task.end_date or '',
+            task.created_at.isoformat(), task.updated_at.isoformat(),
+            task.owner.email, ';'.join(user.email for user in task.collaborators.all()),
+        ])
+        for task in iter_tasks(queryset, chunk_size)
+    )
@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils.functional import cached_property
+
+
+class OrdinalChoiceField(models.SmallIntegerField):
+    """
+    A string choice stored as its position in `choices`.
+
+    The column is a smallint, so ORDER BY, range lookups and indexes follow
+    the order the choices are declared in (low < medium < high) instead of
+    the alphabet, while models, querysets, forms and the API keep using the
+    string values: `filter(priority='high')`, `priority__gt='low'` and
+    `.values('priority')` all work as they did on the CharField.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ordinals = {value: ordinal for ordinal, (value, _) in enumerate(self.choices)}
+
+    @cached_property
+    def validators(self):
+        # The smallint range validators don't apply to the string values
+        return [*self.default_validators, *self._validators]
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else self.choices[value][0]
+
+    def to_python(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return self.choices[value][0]
+        return value
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, int) and not isinstance(value, bool):
+            return value
+        try:
+            return self.ordinals[value]
+        except (KeyError, TypeError):
+            raise ValueError(
+                f"Field '{self.name}' expected one of {', '.join(self.ordinals)}, got {value!r}."
+            ) from None
@@ -0,0 +1,37 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from rest_framework import filters
+
+
+class TaskSearchFilter(filters.SearchFilter):
+    """
+    Full-text `?search=` over the GIN-indexed `Task.search_vector`.
+
+    The query string uses web search syntax ("quoted phrases", -exclusions,
+    OR) and matching tasks are annotated with `search_rank`.
+    """
+    search_config = 'english'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').replace('\x00', '').strip()
+        if not terms:
+            return queryset
+
+        query = SearchQuery(terms, search_type='websearch', config=self.search_config)
+        return queryset.filter(search_vector=query).annotate(
+            # ts_rank returns a real; widen it so cursor positions round-trip exactly.
+            search_rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+        )
+
+
+class TaskOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that ranks search results best-first unless the client
+    asked for an explicit `?ordering=`.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', *self.get_default_ordering(view)]
+        return super().get_ordering(request, queryset, view)
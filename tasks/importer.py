@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .events import publish_board_event
+from .models import Task, BoardMembership
+from .positions import key_after, last_positions
+from .response_cache import bump_board_versions
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+TASK_COLUMNS = [
+    'id', 'title', 'description', 'priority', 'status', 'position', 'start_date', 'end_date',
+    'created_at', 'updated_at', 'owner_id', 'board_id',
+]
+PRIORITY = Task._meta.get_field('priority')
+STATUS = Task._meta.get_field('status')
+
+
+class TaskImportRowSerializer(serializers.ModelSerializer):
+    """
+    One imported row. Accepts the columns written by the CSV export, or the
+    nested owner/collaborators of the NDJSON export.
+    """
+    owner_email = serializers.EmailField(required=False, allow_blank=True)
+    collaborator_emails = serializers.ListField(child=serializers.EmailField(), required=False)
+
+    class Meta:
+        model = Task
+        fields = [
+            'title', 'description', 'priority', 'status', 'start_date', 'end_date',
+            'owner_email', 'collaborator_emails',
+        ]
+        extra_kwargs = {'description': {'allow_blank': True}}
+
+    def to_internal_value(self, data):
+        data = dict(data)
+        if isinstance(data.get('owner'), dict):
+            data.setdefault('owner_email', data['owner'].get('email', ''))
+        if isinstance(data.get('collaborators'), list):
+            data.setdefault('collaborator_emails', [c.get('email') for c in data['collaborators'] if isinstance(c, dict)])
+        if isinstance(data.get('collaborator_emails'), str):
+            data['collaborator_emails'] = [e.strip() for e in data['collaborator_emails'].split(';') if e.strip()]
+        for field in ('start_date', 'end_date', 'priority', 'status'):
+            # Empty CSV cells mean "not set"
+            if data.get(field) == '':
+                data.pop(field)
+        return super().to_internal_value(data)
+
+
+def read_rows(fileobj, import_format):
+    """
+    Yield `(row_number, dict)` pairs from a binary CSV or NDJSON file. Raises
+    UnicodeDecodeError, possibly mid-file, if the file is not UTF-8.
+    """
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    if import_format == 'csv':
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+    else:
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else {'__invalid__': 'Line is not a JSON object.'}
+
+
+def _copy_value(value):
+    """Encode one field for COPY's text format."""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Load `rows` (sequences matching `columns`) into `table` with COPY FROM STDIN."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    cursor.copy_expert(f'COPY {quote(table)} ({", ".join(quote(c) for c in columns)}) FROM STDIN', buffer)
+
+
+class TaskImporter:
+    """
+    Load tasks into a board in batches.
+
+    Each batch is validated with one serializer instance, its owner and
+    collaborator emails are resolved with a single `email__in` query, and
+    valid rows are loaded with COPY: ids are reserved from the task sequence
+    up front so the collaborator links can be copied in the same pass.
+    All batches are written in one transaction: if any row is invalid nothing
+    is imported, unless `partial=True`, in which case valid rows are kept.
+    """
+
+    def __init__(self, board, user, batch_size=1000, partial=False, progress=None):
+        self.board = board
+        self.user = user
+        self.batch_size = batch_size
+        self.partial = partial
+        self.progress = progress
+        self.member_ids = set(BoardMembership.objects.filter(board=board).values_list('user_id', flat=True))
+        self.row_serializer = TaskImportRowSerializer()
+
+    def run(self, rows):
+        """Return `{'created': int, 'errors': [{'row': n, 'errors': {...}}, ...]}`."""
+        errors, created = [], 0
+        rows = iter(rows)
+        with transaction.atomic():
+            while batch := list(islice(rows, self.batch_size)):
+                valid = self.validate_batch(batch, errors)
+                if errors and not self.partial:
+                    # Keep validating to report every bad row, but stop writing.
+                    continue
+                created += self.write_batch(valid)
+                if self.progress:
+                    self.progress(created, len(errors))
+
+            if errors and not self.partial:
+                transaction.set_rollback(True)
+                created = 0
+        return {'created': created, 'errors': errors}
+
+    def validate_batch(self, batch, errors):
+        valid = []
+        for number, row in batch:
+            if '__invalid__' in row:
+                errors.append({'row': number, 'errors': {'non_field_errors': [row['__invalid__']]}})
+                continue
+            try:
+                valid.append((number, self.row_serializer.run_validation(row)))
+            except serializers.ValidationError as exc:
+                errors.append({'row': number, 'errors': exc.detail})
+
+        emails = set()
+        for _, data in valid:
+            emails.update(data.get('collaborator_emails', []))
+            if data.get('owner_email'):
+                emails.add(data['owner_email'])
+        users = {user.email: user for user in User.objects.filter(email__in=emails)} if emails else {}
+
+        rows = []
+        for number, data in valid:
+            owner_email = data.pop('owner_email', '')
+            collaborator_emails = data.pop('collaborator_emails', [])
+            owner = users.get(owner_email) if owner_email else self.user
+            row_errors = {}
+            if owner is None:
+                row_errors['owner_email'] = [f'No user with email {owner_email}.']
+            elif owner.id not in self.member_ids:
+                row_errors['owner_email'] = ['The owner must be a member of the board.']
+            unknown = [email for email in collaborator_emails if email not in users]
+            if unknown:
+                row_errors['collaborator_emails'] = [f'No user with email {email}.' for email in unknown]
+            if row_errors:
+                errors.append({'row': number, 'errors': row_errors})
+                continue
+            rows.append((data, owner.id, {users[email].id for email in collaborator_emails}))
+        return rows
+
+    def write_batch(self, rows):
+        if not rows:
+            return 0
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [Task._meta.db_table, len(rows)],
+            )
+            ids = [task_id for task_id, in cursor.fetchall()]
+            # Imported cards go to the bottom of their columns, in file order
+            tails = last_positions((self.board.id, data.get('status', 'todo')) for data, _, _ in rows)
+            positions = []
+            for data, _, _ in rows:
+                status = data.get('status', 'todo')
+                positions.append(key_after(tails.get((self.board.id, status))))
+                tails[self.board.id, status] = positions[-1]
+            copy_rows(cursor, Task._meta.db_table, TASK_COLUMNS, (
+                (
+                    task_id, data['title'], data.get('description'),
+                    # COPY bypasses the fields; store the ordinals
+                    PRIORITY.get_prep_value(data.get('priority', 'medium')),
+                    STATUS.get_prep_value(data.get('status', 'todo')), position,
+                    data.get('start_date'), data.get('end_date'),
+                    now, now, owner_id, self.board.id,
+                )
+                for task_id, position, (data, owner_id, _) in zip(ids, positions, rows)
+            ))
+            copy_rows(cursor, Task.collaborators.through._meta.db_table, ['task_id', 'user_id'], (
+                (task_id, user_id)
+                for task_id, (_, _, user_ids) in zip(ids, rows)
+                for user_id in user_ids
+            ))
+        # COPY sends no signals; one event per batch tells streams to resync
+        publish_board_event(self.board.id, 'tasks.imported', count=len(rows))
+        bump_board_versions([self.board.id])
+        return len(rows)
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from task_management.renderers import ORJSONRenderer
+from tasks.models import Task, Board, BoardInvitation
+from tasks.serializers import (
+    TaskSerializer, BoardSerializer, BoardInvitationSerializer,
+    TaskValuesSerializer, BoardValuesSerializer, BoardInvitationValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    """Django command to compare the CPU cost of the ModelSerializer and values() list paths"""
+
+    help = (
+        'Fetches, serializes and renders the same task, board and invitation lists with the '
+        'ModelSerializer + JSONRenderer path and the values() + orjson path, checks the bytes '
+        'match and reports the CPU time of each. Run against a seeded database, e.g. after '
+        'explain_hot_paths --seed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200, help='Rows per list.')
+        parser.add_argument('--repeat', type=int, default=20, help='Renders per path.')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        cases = [
+            ('Tasks', TaskSerializer, TaskValuesSerializer,
+             TaskSerializer.setup_eager_loading(Task.objects.order_by('-id'))[:rows]),
+            ('Boards', BoardSerializer, BoardValuesSerializer,
+             Board.objects.active().select_related('owner').order_by('-id')[:rows]),
+            ('Invitations', BoardInvitationSerializer, BoardInvitationValuesSerializer,
+             BoardInvitationSerializer.setup_eager_loading(BoardInvitation.objects.order_by('-id'))[:rows]),
+        ]
+        for label, model_serializer, values_serializer, queryset in cases:
+            def model_path():
+                return JSONRenderer().render(model_serializer(queryset.all(), many=True).data)
+
+            def values_path():
+                return ORJSONRenderer().render(values_serializer(values_serializer.values(queryset.all())).data)
+
+            if model_path() != values_path():
+                raise CommandError(f'{label}: the values() path renders different bytes.')
+            before, after = self.measure(model_path, repeat), self.measure(values_path, repeat)
+            self.stdout.write(
+                f'{label} ({len(values_serializer(values_serializer.values(queryset.all())).data)} rows): '
+                f'{before:.2f} ms -> {after:.2f} ms CPU per list, '
+                + self.style.SUCCESS(f'{100 * (1 - after / before):.0f}% less')
+            )
+
+    def measure(self, render, repeat):
+        """Median process CPU time of one render in milliseconds; database time is not counted."""
+        timings = []
+        for _ in range(repeat):
+            started = time.process_time()
+            render()
+            timings.append(time.process_time() - started)
+        return sorted(timings)[len(timings) // 2] * 1000
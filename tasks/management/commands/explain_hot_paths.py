@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from tasks.calendar import on_day
+from tasks.filters import TaskSearchFilter
+from tasks.models import Task, Board, BoardMembership, BoardInvitation
+from tasks.sync import DeltaSync
+
+SEED_PREFIX = 'explain-seed'
+
+
+class Command(BaseCommand):
+    """Django command to EXPLAIN the hot query paths and check which indexes they use"""
+
+    help = (
+        'Runs EXPLAIN for the queries behind the task, calendar, invitation and '
+        'membership endpoints and reports whether the expected index is used. '
+        'Use --seed to generate a synthetic dataset first, e.g. --seed 1000000.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Number of synthetic tasks to generate first.')
+        parser.add_argument('--boards', type=int, default=1000, help='Number of synthetic boards to spread tasks over.')
+        parser.add_argument('--analyze', action='store_true', help='Run EXPLAIN ANALYZE instead of plain EXPLAIN.')
+        parser.add_argument('--cleanup', action='store_true', help='Delete the synthetic dataset and exit.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('explain_hot_paths requires PostgreSQL.')
+
+        if options['cleanup']:
+            deleted, _ = User.objects.filter(username__startswith=SEED_PREFIX).delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} synthetic rows.'))
+            return
+
+        if options['seed']:
+            self.seed(options['seed'], options['boards'])
+
+        user = User.objects.filter(username=f'{SEED_PREFIX}-0').first()
+        if user is None:
+            raise CommandError('No synthetic data found, run with --seed first.')
+
+        failures = 0
+        for label, queryset, index_name in self.hot_paths(user):
+            plan = queryset.explain(analyze=options['analyze'])
+            used = index_name in plan
+            failures += not used
+            status = self.style.SUCCESS('uses') if used else self.style.ERROR('does NOT use')
+            self.stdout.write(f'\n== {label}: {status} {index_name}')
+            self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f'{failures} hot path(s) did not use their index.')
+
+    def hot_paths(self, user):
+        board = Board.objects.visible_to(user).order_by('id').first()
+        membership = BoardMembership.objects.filter(user=user).order_by('id').first()
+        board_ids = list(Board.objects.visible_to(user).values_list('id', flat=True))
+        window_start = Task.objects.filter(owner=user).aggregate(start=models.Min('start_date'))['start']
+        request = Request(RequestFactory().get('/'))
+        request.user = user
+        sync = DeltaSync(request, limit=500)
+        # An incremental sync polling the last minute of changes
+        sync.since = sync.now - timedelta(minutes=1)
+        return [
+            (
+                'Board task list (BoardViewSet.tasks)',
+                Task.objects.filter(board=board).order_by('status', 'position', 'id')[:51],
+                'task_board_position_idx',
+            ),
+            (
+                'Board tasks newest first (BoardViewSet.tasks, ?ordering=-created_at)',
+                Task.objects.filter(board=board).order_by('-created_at', '-id')[:51],
+                'task_board_created_idx',
+            ),
+            (
+                'Board tasks by priority (BoardViewSet.tasks, ?ordering=-priority)',
+                Task.objects.filter(board=board).order_by('-priority', '-id')[:51],
+                'task_board_priority_idx',
+            ),
+            (
+                'Full-text search (?search=)',
+                TaskSearchFilter().filter_queryset(
+                    Request(RequestFactory().get('/', {'search': '123456'})), Task.objects.all(), None
+                ),
+                'task_search_vector_idx',
+            ),
+            (
+                'Calendar day (TaskViewSet.calendar, ?date=)',
+                on_day(Task.objects.filter(board_id__in=board_ids).involving(user), window_start + timedelta(days=7)),
+                'task_span_idx',
+            ),
+            (
+                'Delta sync (TaskViewSet.sync)',
+                sync.changed(
+                    Task.objects.filter(board__memberships__user=user, board__deleted_at__isnull=True),
+                    models.F('board__memberships__joined_at'), 'board__in',
+                ).order_by('changed_at', 'id')[:501],
+                'task_board_updated_idx',
+            ),
+            (
+                'Pending invitations (my_invitations)',
+                BoardInvitation.objects.filter(invitee_email=user.email, status='pending'),
+                'invitation_pending_idx',
+            ),
+            (
+                'Membership probe (permission checks)',
+                BoardMembership.objects.filter(user=user, board_id=membership.board_id).values('role'),
+                'membership_user_board_uniq',
+            ),
+        ]
+
+    @transaction.atomic
+    def seed(self, task_count, board_count):
+        self.stdout.write(f'Seeding {task_count} tasks over {board_count} boards...')
+        users = User.objects.bulk_create(
+            User(username=f'{SEED_PREFIX}-{i}', email=f'{SEED_PREFIX}-{i}@example.com')
+            for i in range(100)
+        )
+        boards = Board.objects.bulk_create(
+            Board(name=f'{SEED_PREFIX} board {i}', owner=users[i % len(users)])
+            for i in range(board_count)
+        )
+        BoardMembership.objects.bulk_create(
+            BoardMembership(user=users[i % len(users)], board=board, role='owner')
+            for i, board in enumerate(boards)
+        )
+        BoardInvitation.objects.bulk_create(
+            BoardInvitation(
+                board=board, inviter=board.owner, invitee_email=users[(i + 1) % len(users)].email,
+                status='pending' if i % 10 == 0 else 'accepted',
+            )
+            for i, board in enumerate(boards)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO tasks_task (
+                    title, description, priority, status, position, start_date, end_date,
+                    created_at, updated_at, owner_id, board_id
+                )
+                SELECT
+                    'Task ' || g, NULL,
+                    g %% 3, g %% 3,
+                    -- Any digit string not ending in 0 is a valid rank key
+                    lpad(g::text, 9, '0') || '1',
+                    CURRENT_DATE + (g %% 365), CURRENT_DATE + (g %% 365) + 3,
+                    now() - g * interval '1 second', now() - g * interval '1 second',
+                    (%(users)s::bigint[])[1 + g %% %(user_count)s],
+                    (%(boards)s::bigint[])[1 + g %% %(board_count)s]
+                FROM generate_series(1, %(tasks)s) AS g
+                """,
+                {
+                    'users': [u.id for u in users], 'user_count': len(users),
+                    'boards': [b.id for b in boards], 'board_count': len(boards),
+                    'tasks': task_count,
+                },
+            )
+            cursor.execute('ANALYZE tasks_task')
+            cursor.execute('ANALYZE tasks_board')
+            cursor.execute('ANALYZE tasks_boardmembership')
+            cursor.execute('ANALYZE tasks_boardinvitation')
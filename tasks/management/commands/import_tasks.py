@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import IMPORT_FORMATS, TaskImporter, read_rows
+from tasks.models import Board
+
+
+class Command(BaseCommand):
+    """Django command to load tasks into a board from a CSV or NDJSON file"""
+
+    help = 'Imports tasks into a board. Accepts the files written by the board export endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('board', type=int, help='Id of the board to import into.')
+        parser.add_argument('path', help='CSV or NDJSON file.')
+        parser.add_argument('--format', dest='import_format', choices=IMPORT_FORMATS,
+                            help='Defaults to the file extension.')
+        parser.add_argument('--user', help='Username owning rows without an owner_email. Defaults to the board owner.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and inserted per batch.')
+        parser.add_argument('--partial', action='store_true', help='Import valid rows even if some rows are invalid.')
+
+    def handle(self, *args, **options):
+        try:
+            board = Board.objects.active().select_related('owner').get(id=options['board'])
+        except Board.DoesNotExist:
+            raise CommandError(f'Board {options["board"]} does not exist.')
+
+        user = board.owner
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User {options["user"]} does not exist.')
+
+        import_format = options['import_format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if import_format == 'jsonl':
+            import_format = 'ndjson'
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError('Pass --format csv or --format ndjson.')
+
+        def progress(created, failed):
+            self.stdout.write(f'{created} tasks imported, {failed} rows rejected')
+
+        importer = TaskImporter(
+            board, user, batch_size=options['batch_size'], partial=options['partial'], progress=progress,
+        )
+        with open(options['path'], 'rb') as fileobj:
+            try:
+                result = importer.run(read_rows(fileobj, import_format))
+            except UnicodeDecodeError:
+                raise CommandError('The file must be UTF-8 encoded, nothing imported.')
+
+        for error in result['errors']:
+            self.stderr.write(f'Row {error["row"]}: {error["errors"]}')
+        if result['errors'] and not options['partial']:
+            raise CommandError(f'{len(result["errors"])} invalid rows, nothing imported. Use --partial to skip them.')
+        self.stdout.write(self.style.SUCCESS(f'Imported {result["created"]} tasks into board {board.id}'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from tasks.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """Django command to delete expired delta-sync tombstones"""
+
+    help = 'Deletes tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS. Clients with older cursors get a full resync.'
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones'))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from tasks.models import Board
+from tasks.purge import purge_board
+
+
+class Command(BaseCommand):
+    """Django command to purge boards that were deleted through the API"""
+
+    help = 'Deletes the tasks, memberships and invitations of deleted boards in batches. Safe to re-run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.BOARD_PURGE_BATCH_SIZE, help='Tasks deleted per transaction.'
+        )
+        parser.add_argument('--board', type=int, help='Only purge this board.')
+        parser.add_argument('--status', action='store_true', help='List boards waiting to be purged and exit.')
+
+    def handle(self, *args, **options):
+        boards = Board.objects.filter(deleted_at__isnull=False).order_by('deleted_at')
+        if options['board']:
+            boards = boards.filter(id=options['board'])
+
+        if options['status']:
+            for board in boards.annotate(remaining=Count('board_tasks')):
+                self.stdout.write(f'Board {board.id} "{board.name}": deleted {board.deleted_at:%Y-%m-%d %H:%M}, '
+                                  f'{board.remaining} tasks remaining')
+            return
+
+        def progress(board_id, deleted):
+            self.stdout.write(f'Board {board_id}: {deleted} tasks deleted')
+
+        for board_id in boards.values_list('id', flat=True):
+            deleted = purge_board(board_id, batch_size=options['batch_size'], progress=progress)
+            self.stdout.write(self.style.SUCCESS(f'Purged board {board_id} ({deleted} tasks)'))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.db.models.functions import Length
+
+from tasks.models import Task
+from tasks.positions import rebalance_column
+
+
+class Command(BaseCommand):
+    """Django command to rebalance the Kanban positions of board columns"""
+
+    help = (
+        'Rewrites the position keys of every board column (board and status) with a key longer than '
+        'TASK_POSITION_MAX_LENGTH, evenly spaced and in the same order. Safe to re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-length', type=int, help='Rebalance columns with keys longer than this.')
+        parser.add_argument('--board', type=int, help='Only rebalance this board, whatever its key lengths.')
+
+    def handle(self, *args, **options):
+        columns = Task.objects.order_by().values_list('board_id', 'status').distinct()
+        if options['board']:
+            columns = columns.filter(board_id=options['board'])
+        else:
+            max_length = options['max_length'] or settings.TASK_POSITION_MAX_LENGTH
+            columns = columns.annotate(longest=Max(Length('position'))).filter(longest__gt=max_length)
+
+        for board_id, status, *_ in columns:
+            count = rebalance_column(board_id, status)
+            self.stdout.write(self.style.SUCCESS(f'Rebalanced board {board_id} "{status}" ({count} tasks)'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from tasks.counters import reconcile_board_counters
+from tasks.models import Board
+from tasks.response_cache import bump_board_versions
+
+
+class Command(BaseCommand):
+    """Django command to recount the denormalized counters of boards"""
+
+    help = (
+        'Compares the task, member and pending invitation counters of every board with its rows and '
+        'recounts the boards that drifted. Safe to re-run and to run while the API is serving.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, help='Only check this board.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Boards recounted per transaction.')
+
+    def handle(self, *args, **options):
+        boards = Board.objects.all()
+        if options['board']:
+            boards = boards.filter(id=options['board'])
+
+        fixed = reconcile_board_counters(boards, batch_size=options['batch_size'])
+        bump_board_versions(fixed)
+        for board_id in fixed:
+            self.stdout.write(self.style.WARNING(f'Recounted board {board_id}'))
+        self.stdout.write(self.style.SUCCESS(f'{len(fixed)} board(s) recounted.'))
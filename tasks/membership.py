@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import BoardMembership
+
+
+def _cache_key(user_id):
+    return f'board-roles:{user_id}'
+
+
+def get_board_roles(request):
+    """
+    Return the `{board_id: role}` map for the requesting user.
+
+    The map is loaded once per request and, when BOARD_ROLES_CACHE_TIMEOUT is
+    set, shared across requests through the cache until a membership of the
+    user changes (see tasks.signals).
+    """
+    roles = getattr(request, '_board_roles', None)
+    if roles is not None:
+        return roles
+
+    user = request.user
+    if not user.is_authenticated:
+        roles = {}
+    else:
+        timeout = settings.BOARD_ROLES_CACHE_TIMEOUT
+        roles = cache.get(_cache_key(user.id)) if timeout else None
+        if roles is None:
+            roles = dict(
+                BoardMembership.objects.filter(user=user, board__deleted_at__isnull=True)
+                .values_list('board_id', 'role')
+            )
+            if timeout:
+                cache.set(_cache_key(user.id), roles, timeout)
+
+    request._board_roles = roles
+    return roles
+
+
+def is_board_member(request, board_id):
+    return board_id is not None and board_id in get_board_roles(request)
+
+
+def can_see_task(request, task):
+    """Task.objects.visible_to() for a loaded task, from the cached roles map."""
+    return is_board_member(request, task.board_id)
+
+
+def invalidate_board_roles(*user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
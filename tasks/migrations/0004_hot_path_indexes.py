@@ -0,0 +1,47 @@
+# Generated by Django 5.0.3 on 2026-10-17 01:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_alter_task_board"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="boardmembership",
+            constraint=models.UniqueConstraint(
+                fields=("user", "board"),
+                include=("role",),
+                name="membership_user_board_uniq",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="boardmembership",
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name="boardinvitation",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["invitee_email", "-created_at"],
+                name="invitation_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["board", "-created_at", "-id"], name="task_board_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["owner", "start_date"], name="task_owner_start_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 01:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_task_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="board",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+import tasks.fields
+
+
+def to_ordinals(column, values):
+    """Rewrite `column` as a smallint holding each string's position in `values`."""
+    cases = " ".join(f"WHEN '{value}' THEN {ordinal}" for ordinal, value in enumerate(values))
+    return f'ALTER TABLE "tasks_task" ALTER COLUMN "{column}" TYPE smallint USING CASE "{column}" {cases} END'
+
+
+def to_strings(column, values, max_length):
+    """Reverse of to_ordinals()."""
+    cases = " ".join(f"WHEN {ordinal} THEN '{value}'" for ordinal, value in enumerate(values))
+    return (
+        f'ALTER TABLE "tasks_task" ALTER COLUMN "{column}" TYPE varchar({max_length}) '
+        f'USING CASE "{column}" {cases} END'
+    )
+
+
+PRIORITIES = ["low", "medium", "high"]
+STATUSES = ["todo", "in-progress", "done"]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_sync_tombstones"),
+    ]
+
+    operations = [
+        # One table rewrite per column; Django's AlterField would cast the
+        # strings to integers and fail.
+        migrations.RunSQL(
+            sql=to_ordinals("priority", PRIORITIES),
+            reverse_sql=to_strings("priority", PRIORITIES, 10),
+            state_operations=[
+                migrations.AlterField(
+                    model_name="task",
+                    name="priority",
+                    field=tasks.fields.OrdinalChoiceField(
+                        choices=[("low", "Low"), ("medium", "Medium"), ("high", "High")],
+                        default="medium",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            sql=to_ordinals("status", STATUSES),
+            reverse_sql=to_strings("status", STATUSES, 15),
+            state_operations=[
+                migrations.AlterField(
+                    model_name="task",
+                    name="status",
+                    field=tasks.fields.OrdinalChoiceField(
+                        choices=[("todo", "To Do"), ("in-progress", "In Progress"), ("done", "Done")],
+                        default="todo",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["board", "-priority", "-id"], name="task_board_priority_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["board", "status", "id"], name="task_board_status_idx"),
+        ),
+    ]
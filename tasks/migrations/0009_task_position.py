@@ -0,0 +1,60 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:40
+
+from string import ascii_lowercase, ascii_uppercase, digits
+
+from django.db import migrations, models
+
+DIGITS = digits + ascii_uppercase + ascii_lowercase
+BASE = len(DIGITS)
+
+
+def backfill_positions(apps, schema_editor):
+    """
+    Number every column's cards oldest first with the evenly spaced keys of
+    tasks.positions.spread_keys(), in one UPDATE.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(MAX(n), 0) FROM (SELECT COUNT(*) AS n FROM tasks_task GROUP BY board_id, status) c"
+        )
+        (count,) = cursor.fetchone()
+        length, step = 5, BASE**2
+        while (count + 1) * step >= (BASE - BASE // 2) * BASE ** (length - 1):
+            length += 1
+        start = BASE // 2 * BASE ** (length - 1) + 1
+        key = " || ".join(
+            f"substr(%s, (n / {BASE ** k}::bigint %% {BASE})::int + 1, 1)" for k in reversed(range(length))
+        )
+        cursor.execute(
+            f"""
+            UPDATE tasks_task SET position = {key}
+            FROM (
+                SELECT id, {start}::bigint + (row_number() OVER (
+                    PARTITION BY board_id, status ORDER BY created_at, id
+                ) - 1) * {step} AS n
+                FROM tasks_task
+            ) ranked
+            WHERE tasks_task.id = ranked.id
+            """,
+            [DIGITS] * length,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_task_ordinal_priority_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="position",
+            field=models.CharField(blank=True, db_collation="C", default="", editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["board", "status", "position", "id"], name="task_board_position_idx"),
+        ),
+    ]
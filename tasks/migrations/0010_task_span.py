@@ -0,0 +1,51 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:21
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import tasks.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_task_position"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="task",
+            name="task_owner_start_idx",
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="span",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(
+                        end_date__isnull=True, start_date__isnull=True, then=None
+                    ),
+                    default=tasks.models.DateRange(
+                        django.db.models.functions.comparison.Least(
+                            "start_date", "end_date"
+                        ),
+                        django.db.models.functions.comparison.Greatest(
+                            "start_date", "end_date"
+                        ),
+                        models.Value("[]"),
+                    ),
+                ),
+                output_field=django.contrib.postgres.fields.ranges.DateRangeField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["span"], name="task_span_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:31
+
+from django.db import migrations, models
+
+# Board counter -> the rows it counts, per table; Task.status is stored as
+# its ordinal (0 todo, 1 in-progress, 2 done)
+COUNTERS = {
+    "tasks_task": {"todo_count": "status = 0", "in_progress_count": "status = 1", "done_count": "status = 2"},
+    "tasks_boardmembership": {"members_count": "TRUE"},
+    "tasks_boardinvitation": {"pending_invitations_count": "status = 'pending'"},
+}
+CHANGES = {
+    "INSERT": "SELECT *, 1 AS sign FROM new_rows",
+    "UPDATE": "SELECT *, 1 AS sign FROM new_rows UNION ALL SELECT *, -1 AS sign FROM old_rows",
+    "DELETE": "SELECT *, -1 AS sign FROM old_rows",
+}
+TRANSITION_TABLES = {
+    "INSERT": "NEW TABLE AS new_rows",
+    "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "OLD TABLE AS old_rows",
+}
+
+
+def apply_deltas(counters, changes):
+    """
+    Add the statement's net change of each counter to its boards: one UPDATE
+    per board that changed, in id order, so concurrent statements lock boards
+    in the same order and can't deadlock.
+    """
+    sums = ", ".join(f"COALESCE(SUM(sign) FILTER (WHERE {condition}), 0) AS {column}"
+                     for column, condition in counters.items())
+    changed = " OR ".join(f"delta.{column} <> 0" for column in counters)
+    increments = ", ".join(f"{column} = {column} + delta.{column}" for column in counters)
+    return f"""
+        FOR delta IN
+            SELECT board_id, {sums} FROM ({changes}) changes
+            WHERE board_id IS NOT NULL GROUP BY board_id ORDER BY board_id
+        LOOP
+            IF {changed} THEN
+                UPDATE tasks_board SET {increments} WHERE id = delta.board_id;
+            END IF;
+        END LOOP;"""
+
+
+def create_triggers(table, counters):
+    branches = "\n    ELS".join(
+        f"IF TG_OP = '{operation}' THEN{apply_deltas(counters, changes)}" for operation, changes in CHANGES.items()
+    )
+    triggers = "\n".join(
+        f"CREATE TRIGGER {table}_board_counters_{operation.lower()} AFTER {operation} ON {table} "
+        f"REFERENCING {TRANSITION_TABLES[operation]} FOR EACH STATEMENT EXECUTE FUNCTION {table}_board_counters();"
+        for operation in CHANGES
+    )
+    return f"""
+CREATE FUNCTION {table}_board_counters() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    delta record;
+BEGIN
+    {branches}
+    END IF;
+    RETURN NULL;
+END
+$$;
+{triggers}
+"""
+
+
+def drop_triggers(table):
+    return "\n".join(
+        [f"DROP TRIGGER {table}_board_counters_{operation.lower()} ON {table};" for operation in CHANGES]
+        + [f"DROP FUNCTION {table}_board_counters();"]
+    )
+
+
+def backfill(table, counters):
+    counts = ", ".join(f"COUNT(*) FILTER (WHERE {condition}) AS {column}" for column, condition in counters.items())
+    assignments = ", ".join(f"{column} = counts.{column}" for column in counters)
+    return (
+        f"UPDATE tasks_board SET {assignments} "
+        f"FROM (SELECT board_id, {counts} FROM {table} GROUP BY board_id) counts "
+        f"WHERE tasks_board.id = counts.board_id"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_task_span"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="board",
+            name="todo_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="in_progress_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="done_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="members_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="pending_invitations_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="task_count",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.F("todo_count") + models.F("in_progress_count") + models.F("done_count"),
+                output_field=models.PositiveIntegerField(),
+            ),
+        ),
+        # Triggers first: creating them blocks writes to the tables until the
+        # backfill below commits, so no change falls in between.
+        *[
+            migrations.RunSQL(sql=create_triggers(table, counters), reverse_sql=drop_triggers(table))
+            for table, counters in COUNTERS.items()
+        ],
+        *[
+            migrations.RunSQL(sql=backfill(table, counters), reverse_sql=migrations.RunSQL.noop)
+            for table, counters in COUNTERS.items()
+        ],
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0011_board_counters"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tombstone",
+            name="board_id",
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name="tombstone",
+            name="object_id",
+            field=models.BigIntegerField(),
+        ),
+    ]
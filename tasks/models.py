@@ -1,5 +1,28 @@
 from django.db import models
+from django.db.models.functions import Greatest, Least
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import DateRangeField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from .fields import OrdinalChoiceField
+
+class DateRange(models.Func):
+    function = 'daterange'
+    output_field = DateRangeField()
+
+class BoardQuerySet(models.QuerySet):
+    def active(self):
+        """Exclude boards that are deleted and waiting to be purged."""
+        return self.filter(deleted_at__isnull=True)
+
+    def visible_to(self, user):
+        """
+        Active boards `user` is a member of, as a correlated EXISTS on their
+        membership: one row per board, so there is nothing to DISTINCT.
+        """
+        return self.active().filter(models.Exists(
+            BoardMembership.objects.filter(board=models.OuterRef('pk'), user=user)
+        ))
 
 class Board(models.Model):
     name = models.CharField(max_length=255)
@@ -8,19 +31,61 @@ class Board(models.Model):
     members = models.ManyToManyField(User, related_name="boards")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the board is deleted; its rows are then purged in batches (see tasks.purge)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Maintained by database triggers on every write of tasks, memberships and
+    # invitations (see migration 0011); reconcile_board_counters repairs drift.
+    todo_count = models.PositiveIntegerField(default=0, editable=False)
+    in_progress_count = models.PositiveIntegerField(default=0, editable=False)
+    done_count = models.PositiveIntegerField(default=0, editable=False)
+    members_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_invitations_count = models.PositiveIntegerField(default=0, editable=False)
+    task_count = models.GeneratedField(
+        expression=models.F('todo_count') + models.F('in_progress_count') + models.F('done_count'),
+        output_field=models.PositiveIntegerField(),
+        db_persist=True,
+    )
+
+    COUNTER_FIELDS = ('todo_count', 'in_progress_count', 'done_count', 'members_count', 'pending_invitations_count')
+
+    objects = BoardQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
-    @property
-    def task_count(self):
-        return self.board_tasks.count() if self.board_tasks.exists() else 0  # Avoid errors
-    
-    @property
-    def members_count(self):
-        return self.memberships.count()
+    def save(self, *args, **kwargs):
+        # Never write the counters back: the loaded values may be stale by now
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            skipped = {*self.COUNTER_FIELDS, *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and not field.generated and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Tasks `user` can see: those of the active boards they are a member of.
+        Owning or collaborating on a task grants nothing by itself, and tasks
+        without a board are in no one's view. A correlated EXISTS, which
+        PostgreSQL runs as a semi-join from the user's memberships, so each
+        task comes out once without a DISTINCT. tasks.membership.can_see_task()
+        is the same rule for a loaded task.
+        """
+        membership = BoardMembership.objects.filter(
+            board=models.OuterRef('board_id'), board__deleted_at__isnull=True, user=user,
+        )
+        return self.filter(models.Exists(membership))
+
+    def involving(self, user):
+        """Tasks `user` owns or collaborates on, without joining the collaborators."""
+        collaboration = Task.collaborators.through.objects.filter(task=models.OuterRef('pk'), user=user)
+        return self.filter(models.Q(owner=user) | models.Exists(collaboration))
 
 class Task(models.Model):
+    # In ascending order: the columns store the position in these lists
     PRIORITY_CHOICES = [
         ('low', 'Low'),
         ('medium', 'Medium'),
@@ -35,8 +100,11 @@ class Task(models.Model):
 
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
-    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
-    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='todo')
+    priority = OrdinalChoiceField(choices=PRIORITY_CHOICES, default='medium')
+    status = OrdinalChoiceField(choices=STATUS_CHOICES, default='todo')
+    # Rank key of the card within its board and status (see tasks.positions);
+    # "C" collation so keys compare bytewise
+    position = models.CharField(max_length=255, db_collation='C', default='', blank=True, editable=False)
     start_date = models.DateField(null=True, blank=True)
     end_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -46,6 +114,59 @@ class Task(models.Model):
     collaborators = models.ManyToManyField(User, related_name='collaborated_tasks', blank=True)
     board = models.ForeignKey(Board, related_name='board_tasks', on_delete=models.CASCADE, null=True, blank=True)
 
+    # Maintained by PostgreSQL on every write path (save, bulk_create, bulk_update, raw SQL)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('description', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+    # The days on the calendar, both ends included: start to end date, or the
+    # one date a task has (LEAST and GREATEST skip NULLs). NULL without dates.
+    span = models.GeneratedField(
+        expression=models.Case(
+            models.When(start_date__isnull=True, end_date__isnull=True, then=None),
+            default=DateRange(Least('start_date', 'end_date'), Greatest('start_date', 'end_date'), models.Value('[]')),
+        ),
+        output_field=DateRangeField(),
+        db_persist=True,
+    )
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='task_search_vector_idx'),
+            # Board task lists, newest first, with `id` as the keyset tie-breaker
+            models.Index(fields=['board', '-created_at', '-id'], name='task_board_created_idx'),
+            # Calendar windows: tasks whose span overlaps (&&) or contains (@>) the days shown
+            GistIndex(fields=['span'], name='task_span_idx'),
+            # Delta sync: tasks of the caller's boards changed since a cursor
+            models.Index(fields=['board', 'updated_at', 'id'], name='task_board_updated_idx'),
+            # Board task lists by ?ordering=-priority (highest first) or ?ordering=priority
+            models.Index(fields=['board', '-priority', '-id'], name='task_board_priority_idx'),
+            # Board task lists by ?ordering=status, and a board's tasks in one status
+            models.Index(fields=['board', 'status', 'id'], name='task_board_status_idx'),
+            # Kanban columns in card order: BoardViewSet.tasks and moves
+            models.Index(fields=['board', 'status', 'position', 'id'], name='task_board_position_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored board so moving a task can leave a sync tombstone.
+        instance._loaded_board_id = instance.__dict__.get('board_id')
+        # And its status, as the board counts tasks per status
+        if 'status' in instance.__dict__:
+            instance._loaded_status = instance.status
+        # And its column, so moving it to another one places it there (see tasks.positions)
+        if 'status' in instance.__dict__ and 'position' in instance.__dict__:
+            instance._loaded_column = (instance.board_id, instance.status)
+            instance._loaded_position = instance.position
+        return instance
+
     def __str__(self):
         return self.title
 
@@ -62,7 +183,13 @@ class BoardMembership(models.Model):
     joined_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ("user", "board")
+        constraints = [
+            # Covers the (user, board) probe from every permission check, and
+            # carries `role` so those lookups are index-only scans.
+            models.UniqueConstraint(
+                fields=["user", "board"], include=["role"], name="membership_user_board_uniq"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.board.name} ({self.role})"
@@ -87,6 +214,56 @@ class BoardInvitation(models.Model):
 
     class Meta:
         unique_together = ('invitee_email', 'board')  # Prevent duplicate invites
+        indexes = [
+            # Pending invitations for an invitee, the only rows my_invitations reads
+            models.Index(
+                fields=['invitee_email', '-created_at'],
+                condition=models.Q(status='pending'),
+                name='invitation_pending_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Invite to {self.invitee_email} for {self.board.name} ({self.status})"
+
+class Tombstone(models.Model):
+    """
+    A deletion that delta-sync clients replay (see tasks.sync). Task
+    tombstones are visible to the members of `board_id`; board tombstones
+    tell one `user` that they lost access to the board.
+    """
+    KIND_CHOICES = [
+        ('task', 'Task'),
+        ('board', 'Board'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    # Plain integers: the board may already be purged.
+    board_id = models.BigIntegerField()
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board_id', 'created_at'], name='tombstone_board_idx'),
+            models.Index(fields=['user', 'created_at'], name='tombstone_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.kind} {self.object_id}"
+
+
+class StreamTicket(models.Model):
+    """
+    A short-lived ticket that opens one event stream of `board` for `user`
+    (see tasks.events), so browsers' EventSource, which cannot send headers,
+    never puts the access token in a URL. Only a hash of the ticket is stored.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='+')
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Stream ticket of {self.user_id} for board {self.board_id}"
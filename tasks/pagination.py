@@ -0,0 +1,218 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework import filters
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the full ordering tuple plus `id`.
+
+    DRF's CursorPagination only seeks on the first ordering field and falls
+    back to an OFFSET for ties, so deep pages on low-cardinality orderings
+    (status, priority) get slower the further a client scrolls. Here the
+    cursor stores the value of every ordering field of the boundary row and
+    the next page is fetched with a lexicographic WHERE clause, so each page
+    is a bounded index range scan and concurrent inserts never shift pages.
+    """
+    ordering = ('-created_at',)
+    # Used to validate `?ordering=` when the view has no OrderingFilter of
+    # its own (e.g. nested list actions).
+    ordering_fields = None
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views, fetching the page with the async ORM."""
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page([obj async for obj in page_queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the unevaluated queryset for the requested page (one row extra)."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor
+
+        # Previous pages are fetched by walking the ordering backwards.
+        keys = [(name, descending != reverse) for name, descending in self._ordering_keys()]
+        nulls_last = not reverse
+        nulls = {'nulls_last': True} if nulls_last else {'nulls_first': True}
+
+        # NULLS FIRST/LAST only on nullable columns: on NOT NULL ones it changes
+        # nothing but stops PostgreSQL from reading a matching index in order.
+        queryset = queryset.order_by(*[
+            (F(name).desc if descending else F(name).asc)(**(nulls if self._is_nullable(name) else {}))
+            for name, descending in keys
+        ])
+        if current_position is not None:
+            queryset = queryset.filter(self._seek_filter(keys, current_position, nulls_last))
+
+        self.reverse, self.current_position = reverse, current_position
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = self.current_position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.current_position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        has_ordering_filter = any(
+            hasattr(backend, 'get_ordering') for backend in getattr(view, 'filter_backends', [])
+        )
+        if has_ordering_filter or self.ordering_fields is None:
+            ordering = super().get_ordering(request, queryset, view)
+        else:
+            # Validate the requested ordering against this paginator instead of the view.
+            ordering = tuple(filters.OrderingFilter().get_ordering(request, queryset, self))
+
+        # `id` is always the final tie-breaker so the key is unique.
+        names = [field.lstrip('-') for field in ordering]
+        if 'id' not in names and 'pk' not in names:
+            ordering += ('-id' if ordering[-1].startswith('-') else 'id',)
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor((False, self._get_position_from_instance(self.page[-1], self.ordering)))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor((True, self._get_position_from_instance(self.page[0], self.ordering)))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            reverse = bool(payload['r'])
+            position = payload['p']
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        for (name, _), value in zip(self._ordering_keys(), position):
+            if not self._is_valid_position(name, value):
+                raise NotFound(self.invalid_cursor_message)
+
+        return reverse, position
+
+    def encode_cursor(self, cursor):
+        reverse, position = cursor
+        payload = json.dumps({'r': int(reverse), 'p': position}, separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def _ordering_keys(self):
+        return [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+
+    def _is_valid_position(self, name, value):
+        """
+        Whether a cursor value can be compared with the `name` key: a scalar
+        its model field accepts (annotations, e.g. search_rank, only need a
+        scalar), so a crafted cursor cannot fail in the database.
+        """
+        if value is None:
+            return True
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            return False
+        try:
+            field = self.model._meta.pk if name == 'pk' else self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return True
+        try:
+            field.get_prep_value(field.to_python(value))
+        except (ValidationError, ValueError, TypeError, IndexError):
+            return False
+        return True
+
+    def _is_nullable(self, name):
+        try:
+            return self.model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return False
+
+    def _seek_filter(self, keys, position, nulls_last):
+        """
+        Build `(k1, k2, ...) > (v1, v2, ...)` in the direction of each key.
+
+        NULLs sort after every value when paging forwards and before every
+        value when paging backwards, matching the ORDER BY above.
+        """
+        condition = Q(pk__in=[])
+        equal_prefix = Q()
+        for (name, descending), value in zip(keys, position):
+            nullable = self._is_nullable(name)
+            if value is None:
+                after = Q(pk__in=[]) if nulls_last else Q(**{f'{name}__isnull': False})
+                equal = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+                if nullable and nulls_last:
+                    after |= Q(**{f'{name}__isnull': True})
+                equal = Q(**{name: value})
+            condition |= equal_prefix & after
+            equal_prefix &= equal
+        return condition
+
+
+class TaskCursorPagination(KeysetCursorPagination):
+    ordering = ('-created_at',)
+    ordering_fields = ('created_at', 'updated_at', 'priority', 'status', 'position', 'start_date', 'end_date')
+
+
+class BoardTaskCursorPagination(TaskCursorPagination):
+    """A board's cards column by column, in their Kanban order."""
+    ordering = ('status', 'position', 'id')
@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from .models import BoardMembership
+from .membership import can_see_task
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -15,7 +15,8 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 
 class IsBoardMemberOrReadOnly(permissions.BasePermission):
     """
-    Custom permission to allow only board members to edit tasks.
+    Custom permission to allow only board members to edit tasks: whoever can
+    see a task (see Task.objects.visible_to) can edit it.
     """
 
     def has_object_permission(self, request, view, obj):
@@ -23,13 +24,4 @@ class IsBoardMemberOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        # Check if user is the owner
-        if obj.owner == request.user:
-            return True
-
-        # Check if user is a collaborator
-        if obj.collaborators.filter(id=request.user.id).exists():
-            return True
-
-        # Check if user is a board member
-        return BoardMembership.objects.filter(user=request.user, board=obj.board).exists()
\ No newline at end of file
+        return can_see_task(request, obj)
@@ -0,0 +1,253 @@
+"""
+Kanban card positions.
+
+Cards are ordered within their column (board, status) by `Task.position`, a
+fractional rank key: a string over DIGITS read as a base-62 fraction, so
+there is always a key between any two others and moving a card rewrites
+that card alone. Keys never end in '0', which keeps room below every key.
+
+Appending increments the last key at its own length; inserting between
+two cards takes the midpoint, one character longer at worst. Repeated
+inserts at the same spot lengthen keys, so a column whose keys grow past
+TASK_POSITION_MAX_LENGTH is rebalanced: every key is rewritten, evenly
+spaced, in one transaction.
+"""
+import logging
+import threading
+from string import ascii_lowercase, ascii_uppercase, digits
+
+from django.conf import settings
+from django.db import close_old_connections, connection, models, transaction
+from django.utils import timezone
+
+from .events import publish_board_event
+from .models import Task
+from .response_cache import bump_board_versions
+
+logger = logging.getLogger(__name__)
+
+# In ASCII order, so keys compare as strings under the column's "C" collation
+DIGITS = digits + ascii_uppercase + ascii_lowercase
+BASE = len(DIGITS)
+# The first card of a column, and the gap rebalancing leaves between cards
+KEY_LENGTH = 5
+FIRST_DIGIT = BASE // 2
+REBALANCE_STEP = BASE ** 2
+
+
+def encode(number, length):
+    chars = []
+    for _ in range(length):
+        number, digit = divmod(number, BASE)
+        chars.append(DIGITS[digit])
+    return ''.join(reversed(chars))
+
+
+def spread_keys(count):
+    """`count` ascending keys of one length, REBALANCE_STEP apart in the upper half of the key space."""
+    length = KEY_LENGTH
+    while (count + 1) * REBALANCE_STEP >= (BASE - FIRST_DIGIT) * BASE ** (length - 1):
+        length += 1
+    start = FIRST_DIGIT * BASE ** (length - 1) + 1
+    return [encode(start + i * REBALANCE_STEP, length) for i in range(count)]
+
+
+FIRST_KEY = spread_keys(1)[0]
+
+
+def midpoint(low, high):
+    """A key strictly between `low` ('' for the start) and `high` (None for the end)."""
+    if high is not None:
+        # Keep the common prefix, treating `low` as padded with zeros
+        n = 0
+        while n < len(high) and (low[n] if n < len(low) else '0') == high[n]:
+            n += 1
+        if n:
+            return high[:n] + midpoint(low[n:], high[n:])
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else BASE
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit) // 2]
+    # Consecutive first digits: the first digit of `high` alone is between,
+    # unless `high` is that digit; then extend `low`
+    if high is not None and len(high) > 1:
+        return high[0]
+    return DIGITS[low_digit] + midpoint(low[1:], None)
+
+
+def key_after(key):
+    """The next key at the same length, or a longer one once it would overflow."""
+    if key is None:
+        return FIRST_KEY
+    number = 0
+    for char in key:
+        number = number * BASE + DIGITS.index(char)
+    number += 2 if DIGITS.index(key[-1]) == BASE - 1 else 1
+    if number >= BASE ** len(key):
+        return midpoint(key, None)
+    return encode(number, len(key))
+
+
+def key_between(before, after):
+    """A key for a card placed after `before` and before `after`; either may be None."""
+    if after is None:
+        return key_after(before)
+    if before is not None and before >= after:
+        raise ValueError(f'{before!r} does not sort before {after!r}.')
+    return midpoint(before or '', after)
+
+
+def lock_column(board_id, status):
+    """Serialize writers of one column until the transaction ends."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(%s, %s)',
+            [(board_id or 0) % 2 ** 31, Task._meta.get_field('status').get_prep_value(status)],
+        )
+
+
+def last_positions(columns):
+    """
+    {(board_id, status): last key} for the given columns, in one query of
+    one backward index probe per column (a grouped MAX would read them whole).
+    """
+    lasts = [
+        Task.objects.filter(board_id=board_id, status=status, position__gt='')
+        .order_by('-position').values_list('board_id', 'status', 'position')[:1]
+        for board_id, status in set(columns)
+    ]
+    if not lasts:
+        return {}
+    rows = lasts[0].union(*lasts[1:], all=True) if len(lasts) > 1 else lasts[0]
+    return {(board_id, status): last for board_id, status, last in rows}
+
+
+def needs_position(task):
+    """New tasks, and tasks moved to another column without a new position, go to its bottom."""
+    loaded = getattr(task, '_loaded_column', None)
+    return not task.position or (
+        loaded is not None
+        and loaded != (task.board_id, task.status)
+        and task.position == task._loaded_position
+    )
+
+
+def assign_positions(tasks):
+    """
+    Give every task that needs_position() the next keys at the bottom of its
+    column, in order. Works for unsaved tasks and before bulk_update();
+    returns the tasks that were placed.
+    """
+    placed = [task for task in tasks if needs_position(task)]
+    tails = last_positions((task.board_id, task.status) for task in placed)
+    for task in placed:
+        column = (task.board_id, task.status)
+        task.position = tails[column] = key_after(tails.get(column))
+        remember_column(task)
+        check_length(*column, task.position)
+    return placed
+
+
+def remember_column(task):
+    task._loaded_column = (task.board_id, task.status)
+    task._loaded_position = task.position
+
+
+def check_length(board_id, status, key):
+    if len(key) > settings.TASK_POSITION_MAX_LENGTH:
+        schedule_rebalance(board_id, status)
+
+
+def neighbours(column, after_id=None, before_id=None):
+    """
+    The cards of `column` (ordered by position and id) a card goes between:
+    right after `after_id` and/or right before `before_id`, or at the bottom
+    without either. Raises Task.DoesNotExist for ids outside the column and
+    ValueError when both are given but are not adjacent, e.g. because the
+    client's view of the column is out of date.
+    """
+    if after_id is None and before_id is None:
+        return column.last(), None
+    if after_id is not None:
+        above = column.get(pk=after_id)
+        below = column.filter(
+            models.Q(position__gt=above.position) | models.Q(position=above.position, id__gt=above.id)
+        ).first()
+        if before_id is not None and (below is None or below.id != before_id):
+            column.get(pk=before_id)
+            raise ValueError('after_id and before_id must be adjacent cards.')
+        return above, below
+    below = column.get(pk=before_id)
+    above = column.filter(
+        models.Q(position__lt=below.position) | models.Q(position=below.position, id__lt=below.id)
+    ).last()
+    return above, below
+
+
+def move_task(task, status=None, after_id=None, before_id=None):
+    """
+    Move a card to the `status` column of its board (its own by default),
+    between the cards neighbours() picks, and save it: one row written.
+
+    Raises Task.DoesNotExist or ValueError as neighbours() does.
+    """
+    status = status or task.status
+    with transaction.atomic():
+        lock_column(task.board_id, status)
+        column = (
+            Task.objects.filter(board_id=task.board_id, status=status).exclude(pk=task.pk)
+            .order_by('position', 'id').only('id', 'position')
+        )
+        above, below = neighbours(column, after_id, before_id)
+        if above is not None and below is not None and above.position == below.position:
+            # Concurrent appends can share a key; spread the column out first
+            rebalance_column(task.board_id, status)
+            above, below = neighbours(column, after_id, before_id)
+
+        task.status = status
+        task.position = key_between(above and above.position, below and below.position)
+        remember_column(task)
+        task.save(update_fields=['status', 'position', 'updated_at'])
+        check_length(task.board_id, status, task.position)
+    return task
+
+
+def rebalance_column(board_id, status, batch_size=1000):
+    """
+    Rewrite the keys of a column evenly spaced, keeping the order. Touches
+    updated_at, so delta sync sends the new keys, and tells the board's
+    streams to reload. Returns the number of tasks rewritten.
+    """
+    with transaction.atomic():
+        lock_column(board_id, status)
+        tasks = list(
+            Task.objects.filter(board_id=board_id, status=status)
+            .order_by('position', 'id').only('id', 'board_id', 'status', 'position')
+        )
+        now = timezone.now()
+        for task, key in zip(tasks, spread_keys(len(tasks))):
+            task.position, task.updated_at = key, now
+        Task.objects.bulk_update(tasks, ['position', 'updated_at'], batch_size=batch_size)
+        publish_board_event(board_id, 'tasks.reordered', status=status)
+        bump_board_versions([board_id])
+    return len(tasks)
+
+
+def _rebalance_in_thread(board_id, status):
+    close_old_connections()
+    try:
+        count = rebalance_column(board_id, status)
+        logger.info('Rebalanced %s %s tasks of board %s', count, status, board_id)
+    except Exception:
+        # The rebalance_task_positions command will pick the column up again.
+        logger.exception('Rebalancing %s tasks of board %s failed', status, board_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_rebalance(board_id, status):
+    """Rebalance the column in a background thread once the current transaction commits."""
+    if settings.TASK_REBALANCE_IN_PROCESS:
+        transaction.on_commit(
+            lambda: threading.Thread(target=_rebalance_in_thread, args=(board_id, status), daemon=True).start()
+        )
@@ -0,0 +1,69 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .models import Task, Board, BoardMembership, BoardInvitation
+from .events import suppress_events
+from .response_cache import bump_board_versions
+from .sync import suppress_tombstones
+
+logger = logging.getLogger(__name__)
+
+
+def purge_board(board_id, batch_size=1000, progress=None):
+    """
+    Delete a soft-deleted board and everything under it in bounded batches.
+
+    Each batch commits on its own, so locks are held briefly and a crash
+    loses at most one batch of work; running it again resumes where it
+    stopped. The board row goes last, so a board still listed by
+    `Board.objects.filter(deleted_at__isnull=False)` always has work left.
+    No sync tombstones or stream events are written: members got one for the
+    whole board when it was deleted. Returns the number of tasks deleted.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Task.objects.filter(board_id=board_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            Task.collaborators.through.objects.filter(task_id__in=ids).delete()
+            # Plain SQL, bypassing the post_delete receivers on purpose: their
+            # per-task tombstones and events are not wanted (see above), and
+            # for them queryset delete() would load every task of the batch.
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {Task._meta.db_table} WHERE id = ANY(%s)', [ids])
+            bump_board_versions([board_id])
+        deleted += len(ids)
+        if progress:
+            progress(board_id, deleted)
+
+    with transaction.atomic(), suppress_tombstones(), suppress_events():
+        BoardInvitation.objects.filter(board_id=board_id).delete()
+        BoardMembership.objects.filter(board_id=board_id).delete()
+        Board.objects.filter(id=board_id, deleted_at__isnull=False).delete()
+    return deleted
+
+
+def _purge_in_thread(board_id):
+    close_old_connections()
+    try:
+        deleted = purge_board(board_id, batch_size=settings.BOARD_PURGE_BATCH_SIZE)
+        logger.info('Purged board %s (%s tasks)', board_id, deleted)
+    except Exception:
+        # The purge_deleted_boards command will pick the board up again.
+        logger.exception('Purging board %s failed', board_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_purge(board_id):
+    """Purge the board in a background thread once the current transaction commits."""
+    if settings.BOARD_PURGE_IN_PROCESS:
+        transaction.on_commit(
+            lambda: threading.Thread(target=_purge_in_thread, args=(board_id,), daemon=True).start()
+        )
@@ -0,0 +1,107 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .membership import get_board_roles
+
+
+def _user_key(user_id):
+    return f'board-cache:user:{user_id}'
+
+
+def _board_key(board_id):
+    return f'board-cache:board:{board_id}'
+
+
+def _get_versions(keys):
+    """Current version of each key, starting missing ones (never seen, or evicted) at the clock."""
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        start = time.time_ns()
+        for key in missing:
+            cache.add(key, start, None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted: restart above any version handed out before
+            cache.set(key, time.time_ns(), None)
+
+
+def bump_board_versions(board_ids=(), user_ids=()):
+    """
+    Invalidate the cached board responses of `board_ids` and the board lists
+    of `user_ids`. Bumped again on commit, as a request running before the
+    commit may cache the old rows under the new version.
+    """
+    keys = [_board_key(board_id) for board_id in set(board_ids) if board_id]
+    keys += [_user_key(user_id) for user_id in set(user_ids) if user_id]
+    if not keys:
+        return
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def bump_task_boards(tasks, created=False):
+    """
+    Bump the boards whose task counts changed: every board of created tasks,
+    both boards of moved ones, and the board of tasks whose status changed.
+    Call before tasks.sync.record_task_moves().
+    """
+    board_ids = []
+    for task in tasks:
+        loaded = getattr(task, '_loaded_board_id', None)
+        status = task.__dict__.get('status')
+        if created or (loaded is not None and loaded != task.board_id):
+            board_ids += [task.board_id, loaded]
+        elif getattr(task, '_loaded_status', status) != status:
+            board_ids.append(task.board_id)
+        task._loaded_status = status
+    bump_board_versions(board_ids)
+
+
+def board_list_cache_key(request):
+    """
+    Key of the user's board list: their own version plus the version of every
+    board they belong to, so it changes with any of them. None when disabled.
+    """
+    if not settings.BOARD_RESPONSE_CACHE_TIMEOUT:
+        return None
+    board_ids = sorted(get_board_roles(request))
+    versions = _get_versions([_user_key(request.user.id)] + [_board_key(board_id) for board_id in board_ids])
+    digest = hashlib.md5(repr((list(zip(board_ids, versions[1:])), request.GET.urlencode())).encode()).hexdigest()
+    return f'board-cache:list:{request.user.id}:{versions[0]}:{digest}'
+
+
+def board_detail_cache_key(request, board_id):
+    """
+    Key of a board's detail response, shared by its members. None for
+    non-members, who must get the view's own 404, and when disabled.
+    """
+    try:
+        board_id = int(board_id)
+    except (TypeError, ValueError):
+        return None
+    if not settings.BOARD_RESPONSE_CACHE_TIMEOUT or board_id not in get_board_roles(request):
+        return None
+    version, = _get_versions([_board_key(board_id)])
+    digest = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    return f'board-cache:detail:{board_id}:{version}:{digest}'
+
+
+def get_cached_data(key):
+    return cache.get(key) if key else None
+
+
+def set_cached_data(key, response):
+    if key and response.status_code == 200:
+        cache.set(key, response.data, settings.BOARD_RESPONSE_CACHE_TIMEOUT)
@@ -1,9 +1,85 @@
+from operator import itemgetter
+
 from rest_framework import serializers
+from rest_framework.utils.serializer_helpers import ReturnList
 from django.contrib.auth.models import User
+from django.db.models import Prefetch
+from django.utils.functional import cached_property
 from .models import Task, Board, BoardMembership, BoardInvitation
+from .membership import is_board_member
 from users.serializers import UserSerializer
 
-class TaskSerializer(serializers.ModelSerializer):
+USER_FIELDS = tuple(UserSerializer.Meta.fields)
+
+
+def user_columns(relation):
+    """The columns of a nested UserSerializer, as lookups through `relation`."""
+    return [f'{relation}__{field}' for field in USER_FIELDS]
+
+
+class FieldSelection:
+    """
+    The ?fields= and ?expand= of a read request. `fields` are the top-level
+    fields to render, all of them when absent. `expand` are the user
+    relations rendered as nested objects, the others rendering as ids; when
+    absent every relation is expanded, as without a selection.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request, serializer_class):
+        """The request's selection for `serializer_class`, or None when it has neither parameter."""
+        params = request.query_params
+        if 'fields' not in params and 'expand' not in params:
+            return None
+        return cls(
+            cls.parse(params, 'fields', serializer_class.Meta.fields),
+            cls.parse(params, 'expand', serializer_class.expandable_fields),
+        )
+
+    @staticmethod
+    def parse(params, name, choices):
+        if name not in params:
+            return None
+        names = {value.strip() for value in params[name].split(',') if value.strip()}
+        unknown = names.difference(choices)
+        if unknown:
+            raise serializers.ValidationError({
+                name: f"Unknown field(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(choices)}."
+            })
+        return names
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return self.includes(name) and (self.expand is None or name in self.expand)
+
+
+class SparseFieldsMixin:
+    """
+    Render only the fields of the FieldSelection in the serializer context
+    (`field_selection`), with unexpanded user relations as primary keys.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selection = self.context.get('field_selection')
+        if selection is None:
+            return
+        for name in list(self.fields):
+            if not selection.includes(name):
+                self.fields.pop(name)
+            elif name in self.expandable_fields and not selection.expands(name):
+                many = isinstance(self.fields[name], serializers.ListSerializer)
+                self.fields[name] = serializers.PrimaryKeyRelatedField(many=many, read_only=True)
+
+
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     collaborators = UserSerializer(many=True, read_only=True)
     board_id = serializers.PrimaryKeyRelatedField(
@@ -17,21 +93,101 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = [
-            'id', 'title', 'description', 'priority', 'status',
+            'id', 'title', 'description', 'priority', 'status', 'position',
             'start_date', 'end_date', 'created_at', 'updated_at',
             'owner', 'collaborators', 'board_id', 'board_name'
         ]
+    expandable_fields = ('owner', 'collaborators')
+    # Always loaded: the keys permissions check, and the fields tasks are ordered by
+    key_columns = (
+        'id', 'owner_id', 'board_id', 'priority', 'status', 'position',
+        'start_date', 'end_date', 'created_at', 'updated_at',
+    )
+
+    @staticmethod
+    def setup_eager_loading(queryset, selection=None):
+        """
+        Load the nested owner, board and collaborators in a fixed number of
+        queries; with a sparse `selection`, only the columns, joins and
+        prefetches it renders.
+        """
+        # Ordered, so the values() path below renders the same list
+        collaborators = User.objects.order_by('id')
+        if selection is None:
+            return queryset.select_related('owner', 'board').prefetch_related(
+                Prefetch('collaborators', queryset=collaborators)
+            )
 
-    def validate_board(self, board):
+        columns = [*TaskSerializer.key_columns, *(name for name in ('title', 'description') if selection.includes(name))]
+        if selection.expands('owner'):
+            queryset = queryset.select_related('owner')
+            columns += user_columns('owner')
+        if selection.includes('board_name'):
+            queryset = queryset.select_related('board')
+            columns.append('board__name')
+        if selection.includes('collaborators'):
+            collaborators = collaborators.only(*USER_FIELDS if selection.expands('collaborators') else ['id'])
+            queryset = queryset.prefetch_related(Prefetch('collaborators', queryset=collaborators))
+        return queryset.only(*columns)
+
+    def validate_board_id(self, board):
         """Ensure the user is a member of the board before assigning a task."""
-        user = self.context['request'].user
-        if board and not BoardMembership.objects.filter(user=user, board=board).exists():
+        if board and not is_board_member(self.context['request'], board.id):
             raise serializers.ValidationError("You are not a member of this board.")
         return board
 
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
         return super().create(validated_data)
+
+class TaskBulkCreateSerializer(serializers.ModelSerializer):
+    """
+    One item of a bulk create. The board is validated against the cached
+    membership map instead of being fetched, so validating N items costs no
+    queries per item.
+    """
+    board_id = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'priority', 'status', 'start_date', 'end_date', 'board_id']
+
+    def validate_board_id(self, board_id):
+        if board_id is not None and not is_board_member(self.context['request'], board_id):
+            raise serializers.ValidationError("You are not a member of this board.")
+        return board_id
+
+class TaskBulkUpdateSerializer(TaskBulkCreateSerializer):
+    """One item of a bulk partial update, identified by `id`."""
+    id = serializers.IntegerField()
+
+    class Meta(TaskBulkCreateSerializer.Meta):
+        fields = ['id', 'priority', 'status', 'start_date', 'end_date', 'board_id']
+
+    def validate(self, attrs):
+        if 'id' not in attrs:
+            raise serializers.ValidationError({'id': 'This field is required.'})
+        return attrs
+
+class TaskMoveSerializer(serializers.Serializer):
+    """Where to move a card: the status of its column, and the cards to place it between."""
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    after_id = serializers.IntegerField(required=False, allow_null=True)
+    before_id = serializers.IntegerField(required=False, allow_null=True)
+
+class CalendarWindowSerializer(serializers.Serializer):
+    """The calendar's query parameters: a window of days, open-ended on either side, or one `date`."""
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if 'date' in attrs and ('start_date' in attrs or 'end_date' in attrs):
+            raise serializers.ValidationError("Pass either date, or start_date and end_date.")
+        if 'start_date' in attrs and 'end_date' in attrs and attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError({'end_date': ["Must not be before start_date."]})
+        return attrs
+
 class BoardMembershipSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
@@ -39,24 +195,38 @@ class BoardMembershipSerializer(serializers.ModelSerializer):
         model = BoardMembership
         fields = ['id', 'user', 'role', 'joined_at']
 
-class BoardSerializer(serializers.ModelSerializer):
+class BoardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     members = BoardMembershipSerializer(source='boardmembership_set', many=True, read_only=True)
-    task_count = serializers.SerializerMethodField()
+    task_count = serializers.ReadOnlyField()
     description = serializers.CharField(required=False, allow_blank=True)
     members_count = serializers.ReadOnlyField()
     
     class Meta:
         model = Board
-        fields = ['id', 'name', 'description', 'created_at', 'updated_at', 'owner', 'members', 'task_count' , 'members_count']
-    
-    def get_task_count(self, obj):
-        try:
-            return obj.board_tasks.count()
-        except AttributeError:
-            # If the board_tasks relationship doesn't exist yet (before migrations)
-            return 0
-    
+        fields = [
+            'id', 'name', 'description', 'created_at', 'updated_at', 'owner', 'members', 'task_count', 'members_count',
+            'todo_count', 'in_progress_count', 'done_count', 'pending_invitations_count',
+        ]
+    expandable_fields = ('owner',)
+    # Kept on the board row by the database (see Board.COUNTER_FIELDS)
+    counter_fields = ('task_count', *Board.COUNTER_FIELDS)
+
+    @staticmethod
+    def setup_eager_loading(queryset, selection=None):
+        """Join the owner; for a sparse `selection` load only the columns it renders."""
+        if selection is None:
+            return queryset.select_related('owner')
+
+        columns = ['id', 'owner_id', *(
+            name for name in ('name', 'description', 'created_at', 'updated_at', *BoardSerializer.counter_fields)
+            if selection.includes(name)
+        )]
+        if selection.expands('owner'):
+            queryset = queryset.select_related('owner')
+            columns += user_columns('owner')
+        return queryset.only(*columns)
+
     def create(self, validated_data):
         # Set the owner to the current user
         validated_data['owner'] = self.context['request'].user
@@ -68,10 +238,11 @@ class BoardSerializer(serializers.ModelSerializer):
             board=board,
             role='owner'
         )
-        
+        # The membership counted the owner in the database
+        board.refresh_from_db(fields=self.counter_fields)
         return board
 
-class BoardInvitationSerializer(serializers.ModelSerializer):
+class BoardInvitationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     inviter = UserSerializer(read_only=True)
     board_name = serializers.CharField(source='board.name', read_only=True)
     
@@ -79,9 +250,179 @@ class BoardInvitationSerializer(serializers.ModelSerializer):
         model = BoardInvitation
         fields = ['id', 'board', 'board_name', 'inviter', 'invitee_email', 'role', 'status', 'created_at']
         read_only_fields = ['inviter', 'status', 'created_at']
+    expandable_fields = ('inviter',)
+
+    @staticmethod
+    def setup_eager_loading(queryset, selection=None):
+        if selection is None:
+            return queryset.select_related('inviter', 'board')
+
+        columns = ['id', 'board_id', 'inviter_id', *(
+            name for name in ('invitee_email', 'role', 'status', 'created_at') if selection.includes(name)
+        )]
+        if selection.expands('inviter'):
+            queryset = queryset.select_related('inviter')
+            columns += user_columns('inviter')
+        if selection.includes('board_name'):
+            queryset = queryset.select_related('board')
+            columns.append('board__name')
+        return queryset.only(*columns)
     
     def create(self, validated_data):
         # Set the inviter to the current user
         validated_data['inviter'] = self.context['request'].user
         return super().create(validated_data)
 
+
+
+class ValuesSerializer:
+    """
+    Read-only, list-only counterpart of a ModelSerializer for hot list
+    endpoints. Rows come from `.values()` with nested users joined in, and
+    dates are formatted by DRF's own fields, so the rendered output is byte
+    for byte that of the ModelSerializer, without instantiating models or
+    running the field machinery per row.
+
+    With a FieldSelection only the selected fields are rendered, and only
+    their columns and joins are selected.
+    """
+    # Output field -> the column it renders; `get_<field>()` methods render
+    # the others from prepare()d data
+    fields = {}
+    # Columns selected whatever the selection, e.g. for cursor pagination
+    key_columns = ('id',)
+    # Foreign keys to User rendered as nested UserSerializer output
+    user_relations = ()
+    date_columns = ()
+    datetime_columns = ()
+    date_field = serializers.DateField()
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, instance, many=True, context=None, selection=None):
+        assert many, f'{type(self).__name__} only serializes lists.'
+        self.instance = instance
+        self.context = context or {}
+        self.selection = selection or FieldSelection()
+        self.getters = [
+            (name, self.getter(name)) for name in self.fields if self.selection.includes(name)
+        ]
+
+    @classmethod
+    def values(cls, queryset, selection=None):
+        """
+        `queryset` as rows of the columns `selection` renders, keeping
+        annotations such as the search rank for cursors.
+        """
+        selection = selection or FieldSelection()
+        columns = list(cls.key_columns)
+        for name, column in cls.fields.items():
+            if not selection.includes(name):
+                continue
+            if name in cls.user_relations:
+                columns += user_columns(name) if selection.expands(name) else [f'{name}_id']
+            elif column is not None:
+                columns.append(column)
+        names = dict.fromkeys([*columns, *queryset.query.annotations])
+        return queryset.prefetch_related(None).values(*names)
+
+    def getter(self, name):
+        custom = getattr(self, f'get_{name}', None)
+        if custom is not None:
+            return custom
+        if name in self.user_relations:
+            if self.selection.expands(name):
+                return lambda row: self.user(row, name)
+            return itemgetter(f'{name}_id')
+        column = self.fields[name]
+        if column in self.date_columns:
+            return lambda row: self.format_date(row[column])
+        if column in self.datetime_columns:
+            return lambda row: self.format_datetime(row[column])
+        return itemgetter(column)
+
+    @cached_property
+    def data(self):
+        rows = list(self.instance)
+        self.prepare(rows)
+        return ReturnList([self.to_representation(row) for row in rows], serializer=self)
+
+    def prepare(self, rows):
+        """Bulk-load whatever the rows need besides their own columns."""
+
+    def to_representation(self, row):
+        return {name: get(row) for name, get in self.getters}
+
+    def user(self, row, relation):
+        if row[f'{relation}__id'] is None:
+            return None
+        return {field: row[f'{relation}__{field}'] for field in USER_FIELDS}
+
+    def format_date(self, value):
+        return self.date_field.to_representation(value)
+
+    def format_datetime(self, value):
+        return self.datetime_field.to_representation(value)
+
+
+class TaskValuesSerializer(ValuesSerializer):
+    """TaskSerializer output for task lists; collaborators come from one bulk lookup."""
+    fields = {
+        'id': 'id', 'title': 'title', 'description': 'description',
+        'priority': 'priority', 'status': 'status', 'position': 'position',
+        'start_date': 'start_date', 'end_date': 'end_date',
+        'created_at': 'created_at', 'updated_at': 'updated_at',
+        'owner': 'owner', 'collaborators': None,
+        'board_id': 'board_id', 'board_name': 'board__name',
+    }
+    key_columns = TaskSerializer.key_columns
+    user_relations = ('owner',)
+    date_columns = ('start_date', 'end_date')
+    datetime_columns = ('created_at', 'updated_at')
+
+    def prepare(self, rows):
+        self.collaborators = {}
+        if not rows or not self.selection.includes('collaborators'):
+            return
+        through = Task.collaborators.through.objects.filter(task_id__in=[row['id'] for row in rows])
+        if not self.selection.expands('collaborators'):
+            for task_id, user_id in through.order_by('user_id').values_list('task_id', 'user_id'):
+                self.collaborators.setdefault(task_id, []).append(user_id)
+            return
+        for task_id, *user in through.order_by('user_id').values_list(
+            'task_id', *user_columns('user')
+        ):
+            self.collaborators.setdefault(task_id, []).append(dict(zip(USER_FIELDS, user)))
+
+    def get_collaborators(self, row):
+        return self.collaborators.get(row['id'], [])
+
+    def to_representation(self, row):
+        data = super().to_representation(row)
+        # TaskSerializer skips board_name, rather than rendering null, without a board
+        if row['board_id'] is None:
+            data.pop('board_name', None)
+        return data
+
+
+class BoardValuesSerializer(ValuesSerializer):
+    """BoardSerializer output for board lists."""
+    # BoardSerializer.members has no matching attribute and is never rendered
+    fields = {
+        'id': 'id', 'name': 'name', 'description': 'description',
+        'created_at': 'created_at', 'updated_at': 'updated_at', 'owner': 'owner',
+        'task_count': 'task_count', 'members_count': 'members_count', 'todo_count': 'todo_count',
+        'in_progress_count': 'in_progress_count', 'done_count': 'done_count',
+        'pending_invitations_count': 'pending_invitations_count',
+    }
+    user_relations = ('owner',)
+    datetime_columns = ('created_at', 'updated_at')
+
+
+class BoardInvitationValuesSerializer(ValuesSerializer):
+    """BoardInvitationSerializer output for invitation lists."""
+    fields = {
+        'id': 'id', 'board': 'board_id', 'board_name': 'board__name', 'inviter': 'inviter',
+        'invitee_email': 'invitee_email', 'role': 'role', 'status': 'status', 'created_at': 'created_at',
+    }
+    user_relations = ('inviter',)
+    datetime_columns = ('created_at',)
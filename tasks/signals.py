@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from users.serializers import UserSerializer
+
+from .events import publish_board_event, publish_task_events
+from .membership import invalidate_board_roles
+from .positions import assign_positions, remember_column
+from .models import Task, Board, BoardMembership, BoardInvitation
+from .response_cache import bump_board_versions, bump_task_boards
+from .sync import record_board_tombstones, record_task_moves, record_task_tombstones
+
+
+@receiver([post_save, post_delete], sender=BoardMembership)
+def invalidate_membership_cache(sender, instance, **kwargs):
+    invalidate_board_roles(instance.user_id)
+    # A concurrent request may re-cache the old map before we commit.
+    transaction.on_commit(lambda: invalidate_board_roles(instance.user_id))
+
+
+@receiver(post_save, sender=BoardMembership)
+def announce_member(sender, instance, created, **kwargs):
+    publish_board_event(
+        instance.board_id, 'member.added' if created else 'member.updated',
+        user_id=instance.user_id, role=instance.role,
+    )
+
+
+@receiver(post_delete, sender=BoardMembership)
+def record_lost_board(sender, instance, **kwargs):
+    record_board_tombstones(instance.board_id, [instance.user_id])
+    publish_board_event(instance.board_id, 'member.removed', user_id=instance.user_id)
+
+
+@receiver(pre_save, sender=Task)
+def place_task(sender, instance, **kwargs):
+    # New tasks, and tasks moved to another column, go to the bottom of it
+    assign_positions([instance])
+    remember_column(instance)
+
+
+@receiver(post_save, sender=Task)
+def record_saved_task(sender, instance, created, **kwargs):
+    # Events first: they read the board the task was loaded with
+    publish_task_events([instance], 'task.created' if created else 'task.updated')
+    bump_task_boards([instance], created=created)
+    record_task_moves([instance])
+
+
+@receiver(post_delete, sender=Task)
+def record_deleted_task(sender, instance, **kwargs):
+    record_task_tombstones([(instance.id, instance.board_id)])
+    publish_board_event(instance.board_id, 'task.deleted', task={'id': instance.id})
+    bump_board_versions([instance.board_id])
+
+
+@receiver([post_save, post_delete], sender=Board)
+@receiver([post_save, post_delete], sender=BoardInvitation)
+def bump_board(sender, instance, **kwargs):
+    bump_board_versions([instance.board_id if sender is BoardInvitation else instance.pk])
+
+
+@receiver([post_save, post_delete], sender=BoardMembership)
+def bump_membership(sender, instance, **kwargs):
+    bump_board_versions([instance.board_id], [instance.user_id])
+
+
+@receiver(post_save, sender=User)
+def bump_user_boards(sender, instance, created, **kwargs):
+    # Board responses embed the owner's name and email
+    if not created:
+        bump_board_versions(BoardMembership.objects.filter(user=instance).values_list('board_id', flat=True))
+
+
+# The user fields task responses embed for owners and collaborators
+RENDERED_USER_FIELDS = [field for field in UserSerializer.Meta.fields if field != 'id']
+
+
+@receiver(pre_save, sender=User)
+def remember_user_details(sender, instance, update_fields=None, **kwargs):
+    fields = [field for field in RENDERED_USER_FIELDS if update_fields is None or field in update_fields]
+    instance._loaded_details = (
+        User.objects.filter(pk=instance.pk).values(*fields).first() if instance.pk and fields else None
+    )
+
+
+@receiver(post_save, sender=User)
+def touch_user_tasks(sender, instance, created, **kwargs):
+    # Move updated_at of the tasks that render this user, so collection ETags
+    # and delta sync pick up a new name or email
+    loaded = getattr(instance, '_loaded_details', None)
+    if created or not loaded or all(getattr(instance, field) == value for field, value in loaded.items()):
+        return
+    collaborated = Task.collaborators.through.objects.filter(user=instance).values('task_id')
+    Task.objects.filter(Q(owner=instance) | Q(pk__in=collaborated)).update(updated_at=timezone.now())
@@ -0,0 +1,205 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import Task, Board, BoardMembership, Tombstone
+from .serializers import TaskSerializer, BoardSerializer
+
+_suppressed = ContextVar('tombstones_suppressed', default=False)
+
+
+@contextmanager
+def suppress_tombstones():
+    """
+    Skip tombstones inside the block. Used when purging a deleted board, whose
+    members already received a board tombstone when it was deleted.
+    """
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def record_task_tombstones(pairs):
+    """Record `(task_id, board_id)` pairs as deleted for the members of each board."""
+    if _suppressed.get():
+        return
+    Tombstone.objects.bulk_create(
+        Tombstone(kind='task', object_id=task_id, board_id=board_id) for task_id, board_id in pairs if board_id
+    )
+
+
+def record_board_tombstones(board_id, user_ids):
+    """Record that `user_ids` can no longer see `board_id`."""
+    if _suppressed.get():
+        return
+    Tombstone.objects.bulk_create(
+        Tombstone(kind='board', object_id=board_id, board_id=board_id, user_id=user_id) for user_id in user_ids
+    )
+
+
+def record_task_moves(tasks):
+    """
+    Leave a tombstone on the previous board of every task that was moved, so
+    its members drop the task. Call after saving; works for bulk_update too.
+    """
+    moved = []
+    for task in tasks:
+        loaded = getattr(task, '_loaded_board_id', None)
+        if loaded is not None and loaded != task.board_id:
+            moved.append((task.id, loaded))
+        task._loaded_board_id = task.board_id
+    record_task_tombstones(moved)
+
+
+class DeltaSync:
+    """
+    Changes to the tasks and boards a user can see since a server-issued cursor.
+
+    A sync round covers the changes in `(since, upto]`, where `upto` is fixed
+    when the round starts. Tasks are paged on `(changed_at, id)`, `changed_at`
+    being the later of the task's `updated_at` and the caller joining its
+    board, so joining a board delivers its existing tasks. Boards and
+    tombstones come with the first page of a round. The next round starts
+    SYNC_OVERLAP_SECONDS before `upto`, so rows committed late by long
+    transactions are still delivered; clients apply deletions first, then
+    upsert rows by id.
+    """
+
+    def __init__(self, request, limit):
+        self.request = request
+        self.user = request.user
+        self.limit = limit
+        self.now = timezone.now()
+        self.reset = False
+        self.since, self.upto, self.after = self.decode_cursor(request.query_params.get('cursor'))
+        if self.since and self.since < self.now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            # Tombstones this old have been pruned; start over from scratch.
+            self.since, self.upto, self.after, self.reset = None, None, None, True
+        if self.upto is None:
+            self.upto = self.now
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None, None, None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            since = payload['s'] and self.parse_timestamp(payload['s'])
+            upto = payload['u'] and self.parse_timestamp(payload['u'])
+            after = payload['a'] and (self.parse_timestamp(payload['a'][0]), int(payload['a'][1]))
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise ValidationError({'cursor': ['Invalid cursor.']})
+        return since, upto, after
+
+    @staticmethod
+    def parse_timestamp(value):
+        # parse_datetime() returns None for a malformed value, which must not
+        # read as "no cursor" and silently turn into a full sync
+        parsed = parse_datetime(value)
+        if parsed is None or parsed.tzinfo is None:
+            raise ValueError(value)
+        return parsed
+
+    def encode_cursor(self, since, upto=None, after=None):
+        payload = json.dumps({
+            's': since and since.isoformat(),
+            'u': upto and upto.isoformat(),
+            'a': after and [after[0].isoformat(), after[1]],
+        }, separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+
+    def changed(self, queryset, joined_at, board_field):
+        """Annotate `changed_at` and keep the rows changed in this round."""
+        queryset = queryset.annotate(joined_at=joined_at).annotate(
+            changed_at=Greatest('updated_at', 'joined_at'),
+        )
+        if self.since:
+            # Boards joined in this round are spelled out as ids rather than
+            # `joined_at > since`, so that (usually with none) the condition is
+            # a plain range on the (board, updated_at, id) index.
+            changed = models.Q(updated_at__gt=self.since)
+            if self.joined_board_ids:
+                changed |= models.Q(**{board_field: self.joined_board_ids})
+            queryset = queryset.filter(changed)
+        return queryset.filter(changed_at__lte=self.upto)
+
+    @cached_property
+    def joined_board_ids(self):
+        return list(
+            BoardMembership.objects.filter(user=self.user, joined_at__gt=self.since).values_list('board_id', flat=True)
+        )
+
+    def get_tasks(self):
+        # The scope of Task.objects.visible_to(), spelled as the membership
+        # join: the round needs its joined_at for every row, which the join
+        # reads once per board where a subquery would probe once per task.
+        # (user, board) is unique, so no DISTINCT.
+        queryset = self.changed(
+            Task.objects.filter(board__memberships__user=self.user, board__deleted_at__isnull=True),
+            models.F('board__memberships__joined_at'), 'board__in',
+        )
+        if self.after:
+            changed_at, pk = self.after
+            queryset = queryset.filter(
+                models.Q(changed_at__gt=changed_at) | models.Q(changed_at=changed_at, id__gt=pk)
+            )
+        queryset = TaskSerializer.setup_eager_loading(queryset).order_by('changed_at', 'id')
+        return list(queryset[:self.limit + 1])
+
+    def get_boards(self):
+        joined_at = BoardMembership.objects.filter(board=models.OuterRef('pk'), user=self.user).values('joined_at')
+        queryset = self.changed(Board.objects.visible_to(self.user), models.Subquery(joined_at), 'id__in')
+        return queryset.select_related('owner').order_by('id')
+
+    def get_deleted(self):
+        if self.since is None:
+            # A full sync has nothing to delete
+            return {'tasks': [], 'boards': []}
+        board_ids = BoardMembership.objects.filter(user=self.user).values('board_id')
+        tombstones = Tombstone.objects.filter(
+            models.Q(kind='task', board_id__in=board_ids) | models.Q(kind='board', user=self.user),
+            created_at__gt=self.since,
+        ).order_by('id').values_list('kind', 'object_id')
+        deleted = {'tasks': set(), 'boards': set()}
+        for kind, object_id in tombstones:
+            deleted[f'{kind}s'].add(object_id)
+        return {kind: sorted(ids) for kind, ids in deleted.items()}
+
+    def get_data(self, context):
+        tasks = self.get_tasks()
+        has_more = len(tasks) > self.limit
+        tasks = tasks[:self.limit]
+        first_page = self.after is None
+
+        if has_more:
+            last = tasks[-1]
+            cursor = self.encode_cursor(self.since, self.upto, (last.changed_at, last.id))
+        else:
+            cursor = self.encode_cursor(self.upto - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS))
+
+        return {
+            'tasks': TaskSerializer(tasks, many=True, context=context).data,
+            'boards': BoardSerializer(self.get_boards(), many=True, context=context).data if first_page else [],
+            'deleted': self.get_deleted() if first_page else {'tasks': [], 'boards': []},
+            'reset': self.reset,
+            'has_more': has_more,
+            'cursor': cursor,
+        }
+
+
+def prune_tombstones(now=None):
+    """Delete tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS; return how many."""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = Tombstone.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -1,3 +1,1591 @@
-from django.test import TestCase
+import asyncio
+import random
+import csv
+import json
+import tempfile
+import threading
+from base64 import urlsafe_b64encode
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from asgiref.sync import async_to_sync, sync_to_async
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase, APITransactionTestCase, force_authenticate
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import async_views
+from task_management.parsers import ORJSONParser
+from task_management.postgresql_pool.pool import ConnectionPool, PoolTimeout
+from task_management.renderers import ORJSONRenderer
+from .events import Subscription, board_channel, get_broker
+from .membership import get_board_roles
+from .models import Task, Board, BoardMembership, BoardInvitation, StreamTicket, Tombstone
+from .positions import FIRST_KEY, key_after, key_between, spread_keys
+from .purge import purge_board
+from .serializers import (
+    TaskSerializer, BoardSerializer, BoardInvitationSerializer, FieldSelection,
+    TaskValuesSerializer, BoardValuesSerializer, BoardInvitationValuesSerializer,
+)
+from .views import BoardViewSet, TaskViewSet
+
+
+class BoardTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='pass')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        BoardMembership.objects.create(user=self.user, board=self.board, role='owner')
+        self.client.force_authenticate(self.user)
+
+    def create_tasks(self, count, board=None, **kwargs):
+        board = board or self.board
+        tasks = Task.objects.bulk_create(
+            Task(title=f'Task {i}', board=board, **{'owner': self.user, **kwargs}) for i in range(count)
+        )
+        # Spread created_at so ordering is deterministic, with some ties.
+        now = timezone.now()
+        for i, task in enumerate(tasks):
+            task.created_at = now - timedelta(minutes=i // 2)
+        Task.objects.bulk_update(tasks, ['created_at'])
+        return tasks
+
+    def collect(self, url):
+        """Follow `next` links and return the ids of every task seen."""
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(task['id'] for task in response.data['results'])
+            url = response.data['next']
+        return ids
+
+
+class TaskPaginationTests(BoardTestMixin, APITestCase):
+    def test_pages_follow_created_at_then_id(self):
+        tasks = self.create_tasks(7)
+        expected = [t.id for t in sorted(tasks, key=lambda t: (t.created_at, t.id), reverse=True)]
+        self.assertEqual(self.collect('/api/tasks/?page_size=3'), expected)
+
+    def test_ordering_on_low_cardinality_field(self):
+        self.create_tasks(4, priority='high')
+        self.create_tasks(3, priority='low')
+        ids = self.collect('/api/tasks/?page_size=2&ordering=priority')
+        expected = list(Task.objects.order_by('priority', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_nullable_ordering_field(self):
+        self.create_tasks(3)
+        self.create_tasks(3, start_date=timezone.now().date())
+        ids = self.collect('/api/tasks/?page_size=2&ordering=-start_date')
+        self.assertEqual(sorted(ids), sorted(Task.objects.values_list('id', flat=True)))
+        self.assertEqual(len(ids), 6)
+
+    def test_previous_link_returns_prior_page(self):
+        self.create_tasks(5)
+        first = self.client.get('/api/tasks/?page_size=2')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_inserts_do_not_shift_pages(self):
+        self.create_tasks(4)
+        first = self.client.get('/api/tasks/?page_size=2')
+        self.create_tasks(3)
+        second = self.client.get(first.data['next'])
+        seen = {task['id'] for task in first.data['results']}
+        self.assertTrue(seen.isdisjoint(task['id'] for task in second.data['results']))
+        self.assertEqual(len(second.data['results']), 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/tasks/?cursor=bogus')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_values_must_fit_their_keys(self):
+        self.create_tasks(3)
+        cursors = [
+            ({}, [{'$gt': 1}, 1]),
+            ({}, ['2024-01-01T00:00:00+00:00', [1]]),
+            ({}, ['yesterday', 1]),
+            ({}, ['2024-01-01T00:00:00+00:00', 'one']),
+            ({'ordering': 'priority'}, ['urgent', 1]),
+            ({'ordering': 'priority'}, [7, 1]),
+        ]
+        for params, position in cursors:
+            cursor = urlsafe_b64encode(json.dumps({'r': 0, 'p': position}).encode()).decode()
+            response = self.client.get('/api/tasks/', {**params, 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, position)
+
+    def test_board_tasks_paginated(self):
+        self.create_tasks(3)
+        response = self.client.get(f'/api/boards/{self.board.id}/tasks/?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_not_null_keys_order_without_nulls_clause(self):
+        # So the plain (board, -priority, -id) index matches the ORDER BY
+        self.create_tasks(3)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/boards/{self.board.id}/tasks/?ordering=-priority&page_size=2')
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertIn('ORDER BY "tasks_task"."priority" DESC, "tasks_task"."id" DESC', sql)
+
+
+class TaskOrdinalChoiceTests(BoardTestMixin, APITestCase):
+    """priority and status are stored as ordinals and served as strings."""
+
+    def test_ordering_follows_declared_order(self):
+        for priority, status in [('medium', 'done'), ('high', 'todo'), ('low', 'in-progress')]:
+            self.create_tasks(1, priority=priority, status=status)
+        response = self.client.get('/api/tasks/?ordering=-priority')
+        self.assertEqual([t['priority'] for t in response.data['results']], ['high', 'medium', 'low'])
+        response = self.client.get(f'/api/boards/{self.board.id}/tasks/?ordering=status')
+        self.assertEqual([t['status'] for t in response.data['results']], ['todo', 'in-progress', 'done'])
+
+    def test_stored_as_ordinals(self):
+        task = self.create_tasks(1, priority='high', status='in-progress')[0]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT priority, status FROM tasks_task WHERE id = %s', [task.id])
+            self.assertEqual(cursor.fetchone(), (2, 1))
+        task.refresh_from_db()
+        self.assertEqual((task.priority, task.status), ('high', 'in-progress'))
+        self.assertEqual(list(Task.objects.filter(priority__gt='medium').values_list('status', flat=True)), ['in-progress'])
+
+    def test_api_keeps_string_values(self):
+        response = self.client.post('/api/tasks/', {'title': 'New', 'priority': 'high', 'board_id': self.board.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['priority'], response.data['status']), ('high', 'todo'))
+        response = self.client.patch(f"/api/tasks/{response.data['id']}/", {'status': 'finished'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskSearchTests(BoardTestMixin, APITestCase):
+    def test_ranked_full_text_search(self):
+        in_description = Task.objects.create(
+            title='Quarterly report', description='Fix the login flow', owner=self.user, board=self.board
+        )
+        in_title = Task.objects.create(title='Login is broken', owner=self.user, board=self.board)
+        Task.objects.create(title='Unrelated', owner=self.user, board=self.board)
+
+        response = self.client.get('/api/tasks/?search=logins')
+        self.assertEqual([t['id'] for t in response.data['results']], [in_title.id, in_description.id])
+
+    def test_search_respects_membership_and_ordering(self):
+        other = User.objects.create_user(username='carol', password='pass')
+        hidden_board = Board.objects.create(name='Hidden', owner=other)
+        Task.objects.create(title='Deploy pipeline', owner=other, board=hidden_board)
+        first = Task.objects.create(title='Deploy api', owner=self.user, board=self.board, priority='low')
+        second = Task.objects.create(title='Deploy web', owner=self.user, board=self.board, priority='high')
+
+        response = self.client.get('/api/tasks/?search=deploy&ordering=-priority')
+        self.assertEqual([t['id'] for t in response.data['results']], [second.id, first.id])
+
+    def test_search_pages_are_disjoint(self):
+        for i in range(5):
+            Task.objects.create(title=f'Review {i}', owner=self.user, board=self.board)
+        ids = self.collect('/api/tasks/?search=review&page_size=2')
+        self.assertEqual(len(set(ids)), 5)
+
+
+@override_settings(BOARD_ROLES_CACHE_TIMEOUT=300)
+class BoardMembershipResolverTests(BoardTestMixin, APITestCase):
+    def make_request(self, user=None):
+        request = APIRequestFactory().get('/')
+        request.user = user or self.user
+        return request
+
+    def test_loaded_once_per_request_and_cached_across_requests(self):
+        request = self.make_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_board_roles(request), {self.board.id: 'owner'})
+            get_board_roles(request)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_board_roles(self.make_request()), {self.board.id: 'owner'})
+
+    def test_membership_changes_invalidate_cache(self):
+        get_board_roles(self.make_request())
+        board = Board.objects.create(name='Second', owner=self.user)
+        membership = BoardMembership.objects.create(user=self.user, board=board, role='admin')
+        self.assertEqual(get_board_roles(self.make_request())[board.id], 'admin')
+        membership.delete()
+        self.assertNotIn(board.id, get_board_roles(self.make_request()))
+
+    @override_settings(BOARD_ROLES_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        get_board_roles(self.make_request())
+        with self.assertNumQueries(1):
+            get_board_roles(self.make_request())
+
+    def test_write_permission_checks_cost_no_membership_queries(self):
+        other = User.objects.create_user(username='bob', password='pass')
+        task = Task.objects.create(title='Theirs', owner=other, board=self.board)
+        get_board_roles(self.make_request())
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/tasks/{task.id}/', {'status': 'done'})
+        self.assertEqual(response.status_code, 200)
+        # The task is loaded through visible_to(); no separate membership lookup
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT "tasks_boardmembership"')])
+
+    def test_non_member_cannot_assign_board(self):
+        other = User.objects.create_user(username='bob', password='pass')
+        board = Board.objects.create(name='Private', owner=other)
+        response = self.client.post('/api/tasks/', {'title': 'Sneaky', 'board_id': board.id})
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTests(BoardTestMixin, APITestCase):
+    def assertRevalidates(self, url, mutate, queries=1):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        # Only the validator aggregate runs (plus the board lookup for nested routes)
+        with self.assertNumQueries(queries):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        mutate()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_task_list_update(self):
+        task = self.create_tasks(2)[0]
+        self.assertRevalidates('/api/tasks/', lambda: Task.objects.filter(pk=task.pk).update(
+            title='Renamed', updated_at=timezone.now() + timedelta(seconds=1)
+        ))
+
+    def test_task_list_delete(self):
+        tasks = self.create_tasks(3)
+        self.assertRevalidates('/api/tasks/', tasks[1].delete)
+
+    def test_board_tasks_board_rename(self):
+        self.create_tasks(2)
+
+        def rename():
+            self.board.name = 'Renamed'
+            self.board.save()
+        self.assertRevalidates(f'/api/boards/{self.board.id}/tasks/', rename, queries=2)
+
+    def test_calendar_create(self):
+        self.create_tasks(1)
+        # Plus the caller's board ids
+        self.assertRevalidates('/api/tasks/calendar/', lambda: self.create_tasks(1), queries=2)
+
+    def test_collaborator_rename(self):
+        other = User.objects.create_user(username='bob', password='pass')
+        self.create_tasks(1)[0].collaborators.add(other)
+
+        def rename():
+            other.first_name = 'Bob'
+            other.save()
+        self.assertRevalidates('/api/tasks/', rename)
+
+    def test_saving_a_user_unchanged_keeps_the_etag(self):
+        self.create_tasks(1)
+        first = self.client.get('/api/tasks/')
+        self.user.set_password('new')
+        self.user.save()
+        self.assertEqual(self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        # A second write within the same second would be missed
+        self.create_tasks(2)
+        first = self.client.get('/api/tasks/')
+        self.assertIn('no-cache', first['Cache-Control'])
+        Task.objects.filter(board=self.board).first().delete()
+        response = self.client.get('/api/tasks/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_pages_have_distinct_etags(self):
+        self.create_tasks(4)
+        first = self.client.get('/api/tasks/?page_size=2')
+        second = self.client.get(first.data['next'])
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+
+class BulkTaskTests(BoardTestMixin, APITestCase):
+    def test_bulk_create_and_update(self):
+        tasks = self.create_tasks(3)
+        second = Board.objects.create(name='Second', owner=self.user)
+        BoardMembership.objects.create(user=self.user, board=second, role='owner')
+        payload = {
+            'create': [{'title': 'New', 'board_id': self.board.id}, {'title': 'Other', 'priority': 'high'}],
+            'update': [
+                {'id': tasks[0].id, 'status': 'done'},
+                {'id': tasks[1].id, 'board_id': second.id, 'start_date': '2025-01-01'},
+            ],
+        }
+        response = self.client.post('/api/tasks/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual([t['title'] for t in response.data['created']], ['New', 'Other'])
+        self.assertEqual(response.data['updated'][1]['board_name'], 'Second')
+
+        tasks[0].refresh_from_db()
+        tasks[1].refresh_from_db()
+        self.assertEqual(tasks[0].status, 'done')
+        self.assertEqual((tasks[1].board_id, str(tasks[1].start_date)), (second.id, '2025-01-01'))
+        self.assertGreater(tasks[0].updated_at, tasks[2].updated_at)
+        self.assertEqual(Task.objects.filter(owner=self.user, title='Other').count(), 1)
+
+    def test_query_count_independent_of_batch_size(self):
+        tasks = self.create_tasks(40)
+
+        def post(items):
+            payload = {'update': [{'id': t.id, 'priority': 'high'} for t in items],
+                       'create': [{'title': 'x', 'board_id': self.board.id} for _ in items]}
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.post('/api/tasks/bulk/', payload, format='json').status_code, 200)
+            return len(queries)
+
+        post(tasks[:1])  # warm the membership cache
+        self.assertEqual(post(tasks[1:3]), post(tasks[3:]))
+
+    def test_errors_are_reported_per_item_and_nothing_is_written(self):
+        task = self.create_tasks(1)[0]
+        other = User.objects.create_user(username='bob', password='pass')
+        hidden = Task.objects.create(title='Hidden', owner=other)
+        foreign_board = Board.objects.create(name='Foreign', owner=other)
+        payload = {
+            'create': [{'title': 'Fine'}, {'priority': 'urgent'}],
+            'update': [
+                {'id': task.id, 'status': 'done'},
+                {'id': hidden.id, 'status': 'done'},
+                {'id': task.id, 'board_id': foreign_board.id},
+            ],
+        }
+        response = self.client.post('/api/tasks/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['create'][0], {})
+        self.assertEqual(set(response.data['create'][1]), {'title', 'priority'})
+        self.assertEqual(response.data['update'][0], {})
+        self.assertIn('id', response.data['update'][1])
+        self.assertIn('board_id', response.data['update'][2])
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'todo')
+        self.assertFalse(Task.objects.filter(title='Fine').exists())
+
+
+@override_settings(BOARD_PURGE_IN_PROCESS=False)
+@override_settings(SYNC_OVERLAP_SECONDS=0, BOARD_PURGE_IN_PROCESS=False)
+class DeltaSyncTests(BoardTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tasks = self.create_tasks(3)
+        self.other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get('/api/tasks/sync/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_full_then_incremental(self):
+        data = self.sync()
+        self.assertEqual(sorted(task['id'] for task in data['tasks']), sorted(task.id for task in self.tasks))
+        self.assertEqual([board['id'] for board in data['boards']], [self.board.id])
+        self.assertFalse(data['has_more'])
+
+        self.assertEqual(self.sync(data['cursor'])['tasks'], [])
+        self.tasks[0].title = 'Renamed'
+        self.tasks[0].save()
+        changed = self.sync(data['cursor'])
+        self.assertEqual([task['title'] for task in changed['tasks']], ['Renamed'])
+        self.assertEqual(changed['boards'], [])
+
+    def test_tombstones_take_bigint_ids(self):
+        cursor = self.sync()['cursor']
+        task = Task.objects.create(id=2 ** 31 + 1, title='Far', owner=self.user, board=self.board)
+        task.delete()
+        self.assertEqual(self.sync(cursor)['deleted']['tasks'], [2 ** 31 + 1])
+
+    def test_pages_until_done(self):
+        self.create_tasks(4)
+        seen, cursor, pages = [], None, 0
+        while True:
+            data = self.sync(cursor, limit=2)
+            seen += [task['id'] for task in data['tasks']]
+            pages += 1
+            if pages > 1:
+                self.assertEqual(data['boards'], [])
+            cursor = data['cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(pages, 4)
+        self.assertEqual(sorted(seen), sorted(Task.objects.values_list('id', flat=True)))
+
+    def test_tombstones(self):
+        cursor = self.sync()['cursor']
+        shared = Board.objects.create(name='Shared', owner=self.other)
+        membership = BoardMembership.objects.create(user=self.user, board=shared)
+        deleted_id = self.tasks[0].id
+        self.tasks[0].delete()
+
+        data = self.sync(cursor)
+        self.assertEqual(data['deleted'], {'tasks': [deleted_id], 'boards': []})
+        self.assertEqual([board['id'] for board in data['boards']], [shared.id])
+
+        membership.delete()
+        data = self.sync(data['cursor'])
+        self.assertEqual(data['deleted'], {'tasks': [], 'boards': [shared.id]})
+
+        self.client.delete(f'/api/boards/{self.board.id}/')
+        purge_board(self.board.id)
+        data = self.sync(data['cursor'])
+        self.assertEqual(data['deleted'], {'tasks': [], 'boards': [self.board.id]})
+        # The purge itself leaves no per-task tombstones behind
+        self.assertFalse(Tombstone.objects.filter(kind='task').exclude(object_id=deleted_id).exists())
+
+    def test_joining_a_board_delivers_its_tasks(self):
+        board = Board.objects.create(name='Theirs', owner=self.other)
+        BoardMembership.objects.create(user=self.other, board=board, role='owner')
+        old = self.create_tasks(2, board=board, owner=self.other)
+        cursor = self.sync()['cursor']
+
+        BoardMembership.objects.create(user=self.user, board=board)
+        data = self.sync(cursor)
+        self.assertEqual(sorted(task['id'] for task in data['tasks']), sorted(task.id for task in old))
+
+    def test_moved_task_leaves_tombstone(self):
+        board = Board.objects.create(name='Second', owner=self.user)
+        BoardMembership.objects.create(user=self.user, board=board, role='owner')
+        cursor = self.sync()['cursor']
+
+        response = self.client.post(
+            '/api/tasks/bulk/', {'update': [{'id': self.tasks[0].id, 'board_id': board.id}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        task = Task.objects.get(pk=self.tasks[1].pk)
+        task.board = board
+        task.save()
+
+        data = self.sync(cursor)
+        moved = sorted([self.tasks[0].id, self.tasks[1].id])
+        self.assertEqual(data['deleted']['tasks'], moved)
+        self.assertEqual(sorted(task['id'] for task in data['tasks']), moved)
+
+    def test_expired_cursor_resets(self):
+        cursor = self.sync()['cursor']
+        self.tasks[0].delete()
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=31)):
+            data = self.sync(cursor)
+            self.assertTrue(data['reset'])
+            self.assertEqual(len(data['tasks']), 2)
+
+            out = StringIO()
+            call_command('prune_sync_tombstones', stdout=out)
+            self.assertIn('Deleted 1 tombstones', out.getvalue())
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/tasks/sync/', {'cursor': 'nope'}).status_code, 400)
+        since = timezone.now().isoformat()
+        for payload in (
+            {'s': 'yesterday', 'u': None, 'a': None},
+            {'s': since, 'u': '2024-13-45T00:00:00', 'a': None},
+            {'s': since, 'u': None, 'a': ['soon', 1]},
+            {'s': '2024-01-01T00:00:00', 'u': None, 'a': None},
+            {'s': {'$gt': 1}, 'u': None, 'a': None},
+        ):
+            cursor = urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            response = self.client.get('/api/tasks/sync/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, payload)
+
+
+class BoardEventTests(BoardTestMixin, APITransactionTestCase):
+    # Streams authorize on a pooled thread with its own connection, which
+    # cannot see the uncommitted data of a TestCase.
+
+    def setUp(self):
+        super().setUp()
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def ticket(self, board=None):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(f'/api/boards/{(board or self.board).id}/events/ticket/')
+        self.assertEqual(response.status_code, 201)
+        return response.data['ticket']
+
+    async def next_event(self, stream):
+        chunk = (await asyncio.wait_for(anext(stream), 1)).decode()
+        event_type, data = chunk.strip().split('\n')
+        return event_type.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+    async def test_stream_receives_task_and_member_events(self):
+        response = await self.async_client.get(
+            f'/api/boards/{self.board.id}/events/', headers={'authorization': f'Bearer {self.token}'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b': connected\n\n')
+
+        @sync_to_async
+        def change_board():
+            task = Task.objects.create(title='Live', owner=self.user, board=self.board)
+            task.delete()
+            other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+            BoardMembership.objects.create(user=other, board=self.board)
+            return other
+
+        other = await change_board()
+        event_type, data = await self.next_event(stream)
+        self.assertEqual((event_type, data['task']['title']), ('task.created', 'Live'))
+        self.assertEqual((await self.next_event(stream))[0], 'task.deleted')
+        event_type, data = await self.next_event(stream)
+        self.assertEqual((event_type, data['user_id']), ('member.added', other.id))
+        await stream.aclose()
+
+    async def test_stream_ends_when_board_is_deleted(self):
+        ticket = await sync_to_async(self.ticket)()
+        response = await self.async_client.get(f'/api/boards/{self.board.id}/events/?ticket={ticket}')
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        get_broker().publish(board_channel(self.board.id), {'type': 'board.deleted', 'board_id': self.board.id})
+        self.assertEqual((await self.next_event(stream))[0], 'board.deleted')
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertNotIn(board_channel(self.board.id), get_broker().subscriptions)
+
+    async def test_slow_subscriber_overflows(self):
+        subscription = Subscription('board:overflow', maxsize=2)
+        for i in range(5):
+            subscription.put({'type': 'task.updated', 'i': i})
+        await asyncio.sleep(0)
+        # The stream is told to resync instead of silently missing events
+        self.assertEqual(subscription.queue.qsize(), 2)
+        await subscription.get()
+        self.assertIsNone(await subscription.get())
+
+    def test_requires_token_and_membership(self):
+        self.assertEqual(self.client.get(f'/api/boards/{self.board.id}/events/').status_code, 401)
+        board = Board.objects.create(name='Private', owner=self.user)
+        response = self.client.get(
+            f'/api/boards/{board.id}/events/', headers={'authorization': f'Bearer {self.token}'}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.post(f'/api/boards/{board.id}/events/ticket/').status_code, 404)
+
+    def test_tickets_are_single_use(self):
+        url = f'/api/boards/{self.board.id}/events/'
+        self.client.logout()
+        # Access tokens are not accepted in the URL
+        self.assertEqual(self.client.get(f'{url}?token={self.token}').status_code, 401)
+
+        other_board = Board.objects.create(name='Other', owner=self.user)
+        BoardMembership.objects.create(user=self.user, board=other_board, role='owner')
+        self.assertEqual(self.client.get(f'{url}?ticket={self.ticket(other_board)}').status_code, 401)
+
+        with mock.patch('tasks.views.stream_events', return_value=iter([': connected\n\n'])):
+            ticket = self.ticket()
+            self.client.logout()
+            self.assertEqual(self.client.get(f'{url}?ticket={ticket}').status_code, 200)
+        self.assertEqual(self.client.get(f'{url}?ticket={ticket}').status_code, 401)
+
+        ticket = self.ticket()
+        self.client.logout()
+        StreamTicket.objects.update(expires_at=timezone.now())
+        self.assertEqual(self.client.get(f'{url}?ticket={ticket}').status_code, 401)
+
+    def test_bulk_and_purge_paths(self):
+        broker = mock.Mock()
+        with mock.patch('tasks.events.get_broker', return_value=broker):
+            self.client.post('/api/tasks/bulk/', {'create': [{'title': 'A', 'board_id': self.board.id}]}, format='json')
+            self.assertEqual(broker.publish.call_args[0][1]['type'], 'task.created')
+            broker.reset_mock()
+            purge_board(self.board.id)
+            broker.publish.assert_not_called()
+
+
+@override_settings(BOARD_RESPONSE_CACHE_TIMEOUT=0)
+class AsyncReadTests(BoardTestMixin, APITestCase):
+    """The async read views must answer exactly like the sync ones."""
+
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+        BoardMembership.objects.create(user=other, board=self.board)
+        for task in self.create_tasks(3, start_date=timezone.now().date()):
+            task.collaborators.add(other)
+
+    def call(self, view, path, method='get', user=None, **kwargs):
+        request = getattr(self.factory, method)(path, **kwargs.pop('extra', {}))
+        force_authenticate(request, user or self.user)
+        if asyncio.iscoroutinefunction(view):
+            response = async_to_sync(view)(request, **kwargs)
+        else:
+            response = view(request, **kwargs)
+        return response.render() if hasattr(response, 'render') else response
+
+    def assertSameResponse(self, async_view, sync_view, path, **kwargs):
+        with CaptureQueriesContext(connection) as sync_queries:
+            expected = self.call(sync_view, path, **kwargs)
+        with CaptureQueriesContext(connection) as async_queries:
+            response = self.call(async_view, path, **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response.get('ETag'), expected.get('ETag'))
+        self.assertEqual(len(async_queries), len(sync_queries))
+        return response
+
+    def test_task_list(self):
+        response = self.assertSameResponse(
+            async_views.task_list, TaskViewSet.as_view({'get': 'list'}), '/api/tasks/?page_size=2&search=Task'
+        )
+        self.assertEqual(len(response.data['results']), 2)
+        cached = self.call(async_views.task_list, '/api/tasks/?page_size=2&search=Task',
+                           extra={'HTTP_IF_NONE_MATCH': response['ETag']})
+        self.assertEqual(cached.status_code, 304)
+
+    def test_calendar(self):
+        self.assertSameResponse(
+            async_views.task_calendar, TaskViewSet.as_view({'get': 'calendar'}), '/api/tasks/calendar/'
+        )
+
+    def test_board_list(self):
+        self.assertSameResponse(async_views.board_list, BoardViewSet.as_view({'get': 'list'}), '/api/boards/')
+
+    def test_board_tasks(self):
+        path = f'/api/boards/{self.board.id}/tasks/'
+        self.assertSameResponse(
+            async_views.board_tasks, BoardViewSet.as_view({'get': 'tasks'}), path, pk=self.board.id
+        )
+        stranger = User.objects.create_user(username='eve', password='pass')
+        response = self.call(async_views.board_tasks, path, user=stranger, pk=self.board.id)
+        self.assertEqual(response.status_code, 404)
+
+    def test_my_invitations(self):
+        from users.views import my_invitations, my_invitations_async
+
+        board = Board.objects.create(name='Other', owner=self.user)
+        BoardInvitation.objects.create(board=board, inviter=self.user, invitee_email=self.user.email)
+        response = self.assertSameResponse(my_invitations_async, my_invitations, '/api/auth/invitations/')
+        self.assertEqual(len(response.data), 1)
+
+    def test_authentication_and_writes(self):
+        request = self.factory.get('/api/tasks/')
+        self.assertEqual(async_to_sync(async_views.task_list)(request).status_code, 401)
+
+        view = async_views.read_async(async_views.task_list, TaskViewSet.as_view({'post': 'create'}))
+        response = self.call(view, '/api/tasks/', method='post', extra={
+            'data': {'title': 'Written', 'board_id': self.board.id}, 'format': 'json',
+        })
+        self.assertEqual(response.status_code, 201)
+
+
+class ConnectionPoolTests(APITestCase):
+    def make_pool(self, **kwargs):
+        params = connection.get_connection_params()
+        pool = ConnectionPool(lambda: connection.Database.connect(**params), **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_connections(self):
+        pool = self.make_pool()
+        first = pool.getconn()
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        stats = pool.stats()
+        self.assertEqual((stats['checkouts'], stats['connections_opened'], stats['in_use']), (2, 1, 1))
+
+    def test_waits_for_a_returned_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        held = pool.getconn()
+        threading.Timer(0.1, pool.putconn, [held]).start()
+        self.assertIs(pool.getconn(), held)
+        stats = pool.stats()
+        self.assertEqual((stats['waits'], stats['timeouts']), (1, 0))
+        self.assertGreater(stats['wait_ms_max'], 50)
+
+    def test_times_out_when_exhausted(self):
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_replaces_dropped_and_dirty_connections(self):
+        pool = self.make_pool(check_after=0)
+        dropped = pool.getconn()
+        with dropped.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            pid = cursor.fetchone()[0]
+        pool.putconn(dropped)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, dropped)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+        # Returned mid-transaction: rolled back before anyone else gets it
+        with replacement.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        pool.putconn(replacement)
+        self.assertEqual(pool.getconn().get_transaction_status(), 0)
+
+    def test_stats_endpoint_is_staff_only(self):
+        user = User.objects.create_user(username='alice', password='pass')
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get('/api/database/stats/').status_code, 403)
+        user.is_staff = True
+        user.save()
+        response = self.client.get('/api/database/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('conn_max_age', response.data['default'])
+
+
+@override_settings(BOARD_ROLES_CACHE_TIMEOUT=300, BOARD_RESPONSE_CACHE_TIMEOUT=300)
+class BoardResponseCacheTests(BoardTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+        BoardMembership.objects.create(user=self.other, board=self.board)
+        self.detail_url = f'/api/boards/{self.board.id}/'
+
+    def get_board(self, user=None):
+        self.client.force_authenticate(user or self.user)
+        listed = self.client.get('/api/boards/').data
+        detail = self.client.get(self.detail_url).data
+        self.assertEqual([board for board in listed if board['id'] == self.board.id], [detail])
+        return detail
+
+    def test_repeated_reads_are_cached(self):
+        self.get_board()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/boards/').status_code, 200)
+            self.assertEqual(self.client.get(self.detail_url).status_code, 200)
+
+        # Editing a task leaves the board responses as they are
+        task = self.create_tasks(1)[0]
+        self.get_board()
+        task.title = 'Renamed'
+        task.save()
+        with self.assertNumQueries(0):
+            self.client.get('/api/boards/')
+
+    def test_task_changes_update_counts(self):
+        self.get_board(self.other)
+        self.assertEqual(self.get_board()['task_count'], 0)
+        task = Task.objects.create(title='One', owner=self.user, board=self.board)
+        self.assertEqual(self.get_board(self.other)['task_count'], 1)
+
+        self.client.post('/api/tasks/bulk/', {'create': [{'title': 'Two', 'board_id': self.board.id}]}, format='json')
+        self.assertEqual(self.get_board()['task_count'], 2)
+
+        other_board = Board.objects.create(name='Other', owner=self.user)
+        BoardMembership.objects.create(user=self.user, board=other_board, role='owner')
+        task.board = other_board
+        task.save()
+        self.assertEqual(self.get_board()['task_count'], 1)
+        task.delete()
+        self.assertEqual(self.get_board()['task_count'], 1)
+        Task.objects.filter(board=self.board).first().delete()
+        self.assertEqual(self.get_board()['task_count'], 0)
+
+    def test_membership_changes(self):
+        carol = User.objects.create_user(username='carol', email='carol@example.com', password='pass')
+        self.client.force_authenticate(carol)
+        self.assertEqual(self.client.get('/api/boards/').data, [])
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+        self.assertEqual(self.get_board()['members_count'], 2)
+
+        self.client.force_authenticate(self.user)
+        self.client.post('/api/invitations/invite/', {'board_id': self.board.id, 'invitee_email': carol.email})
+        self.assertEqual(self.get_board(carol)['members_count'], 3)
+        self.assertEqual(self.get_board()['members_count'], 3)
+
+        BoardMembership.objects.filter(user=carol).delete()
+        self.client.force_authenticate(carol)
+        self.assertEqual(self.client.get('/api/boards/').data, [])
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+    def test_owner_and_board_changes(self):
+        self.get_board(self.other)
+        self.user.first_name = 'Alice'
+        self.user.save()
+        self.assertEqual(self.get_board(self.other)['owner']['first_name'], 'Alice')
+
+        self.board.name = 'Renamed'
+        self.board.save()
+        self.assertEqual(self.get_board(self.other)['name'], 'Renamed')
+
+        with override_settings(BOARD_PURGE_IN_PROCESS=False):
+            self.client.force_authenticate(self.user)
+            self.client.delete(self.detail_url)
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get('/api/boards/').data, [])
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+
+class FastReadPathTests(BoardTestMixin, APITestCase):
+    """The values() serializers and the orjson renderer must reproduce DRF's bytes."""
+
+    def setUp(self):
+        super().setUp()
+        self.user.first_name = 'Zoë'
+        self.user.save()
+        others = [
+            User.objects.create_user(username=name, email=f'{name}@example.com', password='pass')
+            for name in ('bob', 'carol')
+        ]
+        for task in self.create_tasks(3, start_date=date(2024, 2, 29), description='Line\u2028break "quoted" 日本'):
+            task.collaborators.add(*others)
+        Task.objects.create(title='Loose', owner=others[0], description=None)
+        Board.objects.create(name='Empty', owner=others[1], description=None)
+        BoardInvitation.objects.create(board=self.board, inviter=self.user, invitee_email='new@example.com')
+
+    def assertSameBytes(self, model_serializer, values_serializer, queryset, queries):
+        expected = JSONRenderer().render(model_serializer(queryset, many=True).data)
+        with self.assertNumQueries(queries):
+            rendered = ORJSONRenderer().render(values_serializer(values_serializer.values(queryset)).data)
+        self.assertEqual(rendered, expected)
+
+    def test_tasks(self):
+        queryset = TaskSerializer.setup_eager_loading(Task.objects.order_by('id'))
+        self.assertSameBytes(TaskSerializer, TaskValuesSerializer, queryset, queries=2)
+
+    def test_boards(self):
+        queryset = Board.objects.select_related('owner').order_by('id')
+        self.assertSameBytes(BoardSerializer, BoardValuesSerializer, queryset, queries=1)
+
+    def test_invitations(self):
+        queryset = BoardInvitationSerializer.setup_eager_loading(BoardInvitation.objects.order_by('id'))
+        self.assertSameBytes(BoardInvitationSerializer, BoardInvitationValuesSerializer, queryset, queries=1)
+
+    def test_renderer_matches_drf(self):
+        data = {
+            'when': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            'day': date(2024, 1, 2),
+            'amount': Decimal('1.50'),
+            1: ['\u2029', None, True, 2.5],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        indented = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(indented, JSONRenderer().render({'a': 1}, 'application/json; indent=2'))
+
+    def test_parser(self):
+        self.assertEqual(ORJSONParser().parse(BytesIO('{"title": "Zoë"}'.encode())), {'title': 'Zoë'})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"title": NaN}'))
+
+    def test_api_uses_fast_path(self):
+        response = self.client.get('/api/tasks/', HTTP_ACCEPT='application/json')
+        self.assertIn('Zoë'.encode(), response.content)
+        self.assertIn(b'\\u2028', response.content)
+        self.assertEqual(len(json.loads(response.content)['results']), 3)
+
+
+class SparseFieldsetTests(BoardTestMixin, APITestCase):
+    """?fields= and ?expand= trim the output and the SQL alike."""
+
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+        self.task = self.create_tasks(1, description='Details')[0]
+        self.task.collaborators.add(self.other)
+        BoardInvitation.objects.create(board=self.board, inviter=self.user, invitee_email='new@example.com')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response, ' '.join(query['sql'] for query in queries)
+
+    def test_task_list_fields(self):
+        response, sql = self.get('/api/tasks/?fields=id,title,status,priority')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'priority', 'status'])
+        for skipped in ('"auth_user"."username"', 'tasks_task_collaborators', '"description"', '"tasks_board"."name"'):
+            self.assertNotIn(skipped, sql)
+
+    def test_task_detail_fields(self):
+        response, sql = self.get(f'/api/tasks/{self.task.id}/?fields=id,title,board_name')
+        self.assertEqual(response.data, {'id': self.task.id, 'title': 'Task 0', 'board_name': 'Board'})
+        self.assertNotIn('tasks_task_collaborators', sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_expand_renders_other_relations_as_ids(self):
+        for url in ('/api/tasks/?expand=owner', f'/api/tasks/{self.task.id}/?expand=owner'):
+            response, sql = self.get(url)
+            task = response.data['results'][0] if 'results' in response.data else response.data
+            self.assertEqual(task['owner']['username'], 'alice')
+            self.assertEqual(task['collaborators'], [self.other.id])
+            self.assertNotIn('"auth_user"."email"', sql.split('tasks_task_collaborators')[-1])
+
+        response, sql = self.get('/api/tasks/?expand=')
+        task = response.data['results'][0]
+        self.assertEqual((task['owner'], task['collaborators']), (self.user.id, [self.other.id]))
+        self.assertNotIn('"auth_user"', sql.split('FROM "tasks_task"')[-1])
+
+    def test_values_path_matches_serializer(self):
+        request = APIRequestFactory().get('/', {'fields': 'id,owner,collaborators,board_name', 'expand': 'collaborators'})
+        selection = FieldSelection.from_request(Request(request), TaskSerializer)
+        queryset = TaskSerializer.setup_eager_loading(Task.objects.order_by('id'), selection)
+        expected = TaskSerializer(queryset, many=True, context={'field_selection': selection}).data
+        rows = TaskValuesSerializer.values(queryset, selection)
+        self.assertEqual(TaskValuesSerializer(rows, selection=selection).data, expected)
+
+    def test_board_fields(self):
+        response, sql = self.get('/api/boards/?fields=id,name,task_count')
+        self.assertEqual(response.data, [{'id': self.board.id, 'name': 'Board', 'task_count': 1}])
+        self.assertNotIn('"members_count"', sql)
+        self.assertNotIn('"auth_user"."username"', sql)
+
+        response, sql = self.get(f'/api/boards/{self.board.id}/?fields=name,members_count&expand=')
+        self.assertEqual(response.data, {'name': 'Board', 'members_count': 1})
+        self.assertNotIn('"tasks_task"', sql)
+
+    def test_board_tasks_and_invitations(self):
+        response, _ = self.get(f'/api/boards/{self.board.id}/tasks/?fields=id,title')
+        self.assertEqual(response.data['results'], [{'id': self.task.id, 'title': 'Task 0'}])
+
+        response, sql = self.get('/api/invitations/?fields=id,invitee_email,inviter&expand=')
+        self.assertEqual(list(response.data[0]), ['id', 'inviter', 'invitee_email'])
+        self.assertEqual(response.data[0]['inviter'], self.user.id)
+        self.assertNotIn('"tasks_board"."name"', sql)
+
+    def test_unknown_fields(self):
+        response = self.client.get('/api/tasks/?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/boards/?expand=members')
+        self.assertEqual(response.status_code, 400)
+
+    def test_writes_ignore_selection(self):
+        response = self.client.patch(f'/api/tasks/{self.task.id}/?fields=id', {'title': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Renamed')
+
+
+class BoardDeletionTests(BoardTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+        BoardMembership.objects.create(user=self.member, board=self.board)
+        BoardInvitation.objects.create(board=self.board, inviter=self.user, invitee_email='new@example.com')
+        for task in self.create_tasks(7):
+            task.collaborators.add(self.member)
+
+    def test_delete_hides_board_immediately(self):
+        response = self.client.delete(f'/api/boards/{self.board.id}/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Task.objects.filter(board=self.board).count(), 7)
+
+        self.assertEqual(self.client.get('/api/boards/').data, [])
+        self.assertEqual(self.client.get('/api/tasks/').data['results'], [])
+        self.assertEqual(self.client.get(f'/api/boards/{self.board.id}/').status_code, 404)
+        response = self.client.post('/api/tasks/', {'title': 'Late', 'board_id': self.board.id})
+        self.assertEqual(response.status_code, 400)
+
+    def test_purge_in_batches_and_resume(self):
+        self.client.delete(f'/api/boards/{self.board.id}/')
+        progress = []
+
+        def crash_after_first_batch(board_id, deleted):
+            progress.append(deleted)
+            raise RuntimeError('worker died')
+
+        with self.assertRaises(RuntimeError):
+            purge_board(self.board.id, batch_size=3, progress=crash_after_first_batch)
+        self.assertEqual(Task.objects.filter(board=self.board).count(), 4)
+        self.assertTrue(Board.objects.filter(pk=self.board.pk).exists())
+
+        out = StringIO()
+        call_command('purge_deleted_boards', '--batch-size', '3', stdout=out)
+        self.assertIn('Purged board', out.getvalue())
+        self.assertFalse(Board.objects.filter(pk=self.board.pk).exists())
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(Task.collaborators.through.objects.exists())
+        self.assertFalse(BoardInvitation.objects.exists())
+        self.assertFalse(BoardMembership.objects.filter(board_id=self.board.pk).exists())
+
+    def test_purge_deletes_tasks_without_loading_them(self):
+        self.client.delete(f'/api/boards/{self.board.id}/')
+        with CaptureQueriesContext(connection) as queries, \
+                mock.patch('tasks.purge.bump_board_versions') as bump, \
+                mock.patch('tasks.signals.record_task_tombstones') as tombstones:
+            self.assertEqual(purge_board(self.board.id, batch_size=3), 7)
+        self.assertEqual(bump.call_count, 3)
+        tombstones.assert_not_called()
+        loaded = [q for q in queries if q['sql'].startswith('SELECT "tasks_task"."id", "tasks_task"."title"')]
+        self.assertFalse([q for q in loaded if '"tasks_task"."id" IN' in q['sql']])
+
+    @override_settings(BOARD_PURGE_BATCH_SIZE=2)
+    def test_command_batch_size_defaults_to_setting(self):
+        self.client.delete(f'/api/boards/{self.board.id}/')
+        out = StringIO()
+        call_command('purge_deleted_boards', stdout=out)
+        self.assertIn(f'Board {self.board.id}: 2 tasks deleted', out.getvalue())
+
+    def test_status_lists_remaining_tasks(self):
+        self.client.delete(f'/api/boards/{self.board.id}/')
+        out = StringIO()
+        call_command('purge_deleted_boards', '--status', stdout=out)
+        self.assertIn('7 tasks remaining', out.getvalue())
+
+
+class BoardExportTests(BoardTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+        for task in self.create_tasks(5):
+            task.collaborators.add(self.other)
+
+    def test_ndjson_matches_api_representation(self):
+        response = self.client.get(f'/api/boards/{self.board.id}/export/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        detail = self.client.get(f'/api/tasks/{rows[0]["id"]}/').data
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], json.loads(json.dumps(detail)))
+
+    def test_csv(self):
+        response = self.client.get(f'/api/boards/{self.board.id}/export/?export_format=csv')
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual((rows[0]['owner_email'], rows[0]['collaborator_emails']), ('alice@example.com', 'bob@example.com'))
+
+    def test_queries_scale_with_chunks_not_rows(self):
+        with mock.patch.object(BoardViewSet, 'export_chunk_size', 2):
+            with CaptureQueriesContext(connection) as small:
+                b''.join(self.client.get(f'/api/boards/{self.board.id}/export/').streaming_content)
+            self.create_tasks(1)
+            with CaptureQueriesContext(connection) as large:
+                b''.join(self.client.get(f'/api/boards/{self.board.id}/export/').streaming_content)
+        # 5 tasks -> 3 chunks, 6 tasks -> 3 chunks: one collaborator prefetch per chunk
+        self.assertEqual(len(small), len(large))
+
+    async def test_streams_under_asgi(self):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        url = f'/api/boards/{self.board.id}/export/?export_format=csv'
+        response = await self.async_client.get(url, headers={'authorization': f'Bearer {token}'})
+        # An async iterator: Django would otherwise buffer the whole export
+        self.assertTrue(response.is_async)
+        streamed = b''.join([part async for part in response.streaming_content])
+        expected = await sync_to_async(lambda: b''.join(self.client.get(url).streaming_content))()
+        self.assertEqual(streamed, expected)
+
+    def test_unknown_format(self):
+        response = self.client.get(f'/api/boards/{self.board.id}/export/?export_format=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskPositionTests(BoardTestMixin, APITestCase):
+    """Kanban positions: rank keys, placement, moves and rebalancing."""
+
+    def column(self, status='todo'):
+        return list(Task.objects.filter(board=self.board, status=status).order_by('position', 'id').values_list('id', flat=True))
+
+    def create(self, title, **data):
+        response = self.client.post('/api/tasks/', {'title': title, 'board_id': self.board.id, **data})
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def move(self, task_id, **data):
+        return self.client.post(f'/api/tasks/{task_id}/move/', data, format='json')
+
+    def test_keys_stay_ordered(self):
+        rng = random.Random(7)
+        keys = [FIRST_KEY]
+        for _ in range(500):
+            i = rng.randrange(len(keys) + 1)
+            keys.insert(i, key_between(keys[i - 1] if i else None, keys[i] if i < len(keys) else None))
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertFalse(any(key.endswith('0') for key in keys))
+
+        appended = [FIRST_KEY]
+        for _ in range(5000):
+            appended.append(key_after(appended[-1]))
+        self.assertEqual(appended, sorted(appended))
+        self.assertEqual({len(key) for key in appended}, {len(FIRST_KEY)})
+        self.assertEqual(key_after('zzzzz'), 'zzzzzV')
+        self.assertEqual(spread_keys(3), sorted(spread_keys(3)))
+        with self.assertRaises(ValueError):
+            key_between('b', 'a')
+
+    def test_new_and_recolumned_tasks_go_to_the_bottom(self):
+        first, second, third = (self.create(title) for title in ('A', 'B', 'C'))
+        self.assertEqual(self.column(), [first, second, third])
+        done = self.create('D', status='done')
+
+        self.client.patch(f'/api/tasks/{first}/', {'status': 'done'})
+        self.assertEqual(self.column('done'), [done, first])
+
+        response = self.client.post('/api/tasks/bulk/', {
+            'create': [{'title': 'E', 'board_id': self.board.id}],
+            'update': [{'id': second, 'status': 'done'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        created = response.data['created'][0]['id']
+        self.assertEqual(self.column(), [third, created])
+        self.assertEqual(self.column('done'), [done, first, second])
+
+    def test_move_writes_one_row(self):
+        ids = [self.create(title) for title in 'ABCD']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move(ids[3], after_id=ids[0])
+        self.assertEqual(response.status_code, 200)
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('UPDATE', 'INSERT'))]
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(self.column(), [ids[0], ids[3], ids[1], ids[2]])
+        self.assertEqual(response.data['position'], Task.objects.get(id=ids[3]).position)
+
+        self.move(ids[2], before_id=ids[0])
+        self.assertEqual(self.column(), [ids[2], ids[0], ids[3], ids[1]])
+        self.move(ids[0], status='in-progress')
+        self.assertEqual(self.column('in-progress'), [ids[0]])
+        self.move(ids[2])
+        self.assertEqual(self.column(), [ids[3], ids[1], ids[2]])
+
+    def test_board_tasks_in_kanban_order(self):
+        todo = [self.create(title) for title in 'AB']
+        done = self.create('C', status='done')
+        self.move(todo[1], before_id=todo[0])
+        response = self.client.get(f'/api/boards/{self.board.id}/tasks/?page_size=2')
+        ids = [task['id'] for task in response.data['results']]
+        ids += [task['id'] for task in self.client.get(response.data['next']).data['results']]
+        self.assertEqual(ids, [todo[1], todo[0], done])
+
+    def test_invalid_moves(self):
+        ids = [self.create(title) for title in 'AB']
+        other = self.create('C', status='done')
+        self.assertEqual(self.move(ids[0], after_id=other).status_code, 400)
+        self.assertEqual(self.move(ids[0], after_id=ids[1], before_id=ids[1]).status_code, 400)
+        # Not adjacent: the client's column is stale
+        third = self.create('D')
+        self.assertEqual(self.move(third, after_id=ids[0], before_id=ids[1]).status_code, 200)
+        self.assertEqual(self.move(other, status='todo', after_id=ids[0], before_id=ids[1]).status_code, 400)
+        self.assertEqual(self.move(ids[0], status='later').status_code, 400)
+        stranger = User.objects.create_user(username='mallory', password='pass')
+        self.client.force_authenticate(stranger)
+        self.assertEqual(self.move(ids[0]).status_code, 404)
+
+    def test_shared_keys_are_spread_before_inserting(self):
+        ids = [self.create(title) for title in 'ABC']
+        Task.objects.filter(id__in=ids[:2]).update(position='V')
+        response = self.move(ids[2], after_id=ids[0], before_id=ids[1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.column(), [ids[0], ids[2], ids[1]])
+
+    @override_settings(TASK_POSITION_MAX_LENGTH=8, TASK_REBALANCE_IN_PROCESS=False)
+    def test_rebalance(self):
+        ids = [self.create(title) for title in 'AB']
+        for i in range(20):
+            moved = self.create(f'Inserted {i}')
+            self.move(moved, after_id=ids[0])
+            ids.insert(1, moved)
+        order = self.column()
+        self.assertEqual(order, ids)
+        self.assertGreater(max(len(key) for key in Task.objects.values_list('position', flat=True)), 8)
+
+        out = StringIO()
+        call_command('rebalance_task_positions', stdout=out)
+        self.assertIn('22 tasks', out.getvalue())
+        self.assertEqual(self.column(), order)
+        self.assertEqual(set(Task.objects.values_list('position', flat=True)), set(spread_keys(22)))
+
+
+class TaskImportTests(BoardTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+        BoardMembership.objects.create(user=self.other, board=self.board)
+
+    def upload(self, name, content, query=''):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(f'/api/boards/{self.board.id}/import/{query}', {'file': upload}, format='multipart')
+
+    def test_round_trips_export(self):
+        for task in self.create_tasks(3, owner=self.other, description='Line 1\n\tLine 2 \\ end'):
+            task.collaborators.add(self.user)
+        exports = {
+            export_format: b''.join(self.client.get(
+                f'/api/boards/{self.board.id}/export/?export_format={export_format}'
+            ).streaming_content).decode()
+            for export_format in ('csv', 'ndjson')
+        }
+        for export_format, content in exports.items():
+            response = self.upload(f'tasks.{export_format}', content)
+            self.assertEqual(response.status_code, 201, response.data)
+            self.assertEqual(response.data, {'created': 3, 'errors': []})
+        self.assertEqual(Task.objects.filter(owner=self.other, collaborators=self.user).count(), 9)
+        self.assertEqual(set(Task.objects.values_list('description', flat=True)), {'Line 1\n\tLine 2 \\ end'})
+
+    def test_rejects_files_that_are_not_utf8(self):
+        # Past the first read, so batches were written before the bad byte
+        content = ('title\n' + 'Task\n' * 3000 + 'Café\n').encode('latin-1')
+        with mock.patch.object(BoardViewSet, 'import_batch_size', 1000):
+            response = self.client.post(f'/api/boards/{self.board.id}/import/?partial=true', {
+                'file': SimpleUploadedFile('tasks.csv', content),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'The file must be UTF-8 encoded.'})
+        self.assertFalse(Task.objects.exists())
+
+    def test_invalid_rows_reject_the_file(self):
+        content = 'title,priority,owner_email\nOk,high,\n,low,\nStranger,low,nobody@example.com\n'
+        response = self.upload('tasks.csv', content)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3])
+        self.assertIn('title', response.data['errors'][0]['errors'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_partial_keeps_valid_rows(self):
+        content = '{"title": "Ok", "status": "done"}\nnot json\n{"title": "Bad", "priority": "urgent"}\n'
+        response = self.upload('tasks.ndjson', content, '?partial=true')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3])
+        self.assertEqual(Task.objects.get().owner, self.user)
+
+    def test_queries_scale_with_batches_not_rows(self):
+        rows = ''.join(f'{{"title": "T{i}", "collaborator_emails": ["bob@example.com"]}}\n' for i in range(40))
+        with mock.patch.object(BoardViewSet, 'import_batch_size', 20):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.upload('tasks.ndjson', rows).status_code, 201)
+        self.assertLess(len(queries), 20)
+        self.assertEqual(Task.collaborators.through.objects.count(), 40)
+
+    def test_non_member_board(self):
+        board = Board.objects.create(name='Private', owner=self.other)
+        upload = SimpleUploadedFile('tasks.csv', b'title\nX\n')
+        response = self.client.post(f'/api/boards/{board.id}/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 404)
+
+    def test_management_command(self):
+        path = self.enterContext(tempfile.TemporaryDirectory()) + '/tasks.csv'
+        with open(path, 'w') as fileobj:
+            fileobj.write('title,owner_email,collaborator_emails\nA,bob@example.com,alice@example.com;bob@example.com\n')
+        out = StringIO()
+        call_command('import_tasks', self.board.id, path, stdout=out)
+        self.assertIn('Imported 1 tasks', out.getvalue())
+        task = Task.objects.get()
+        self.assertEqual((task.owner, task.collaborators.count()), (self.other, 2))
+
+
+class TaskVisibilityTests(BoardTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username='bob', password='pass')
+        self.private = Board.objects.create(name='Private', owner=self.other)
+        BoardMembership.objects.create(user=self.other, board=self.private, role='owner')
+
+    def test_querysets_use_exists_without_distinct(self):
+        for queryset in (Task.objects.visible_to(self.user), Board.objects.visible_to(self.user)):
+            sql = str(queryset.query)
+            self.assertIn('EXISTS', sql)
+            self.assertNotIn('DISTINCT', sql)
+            self.assertNotIn('INNER JOIN "tasks_boardmembership"', sql)
+
+    def test_scope_is_board_membership(self):
+        mine = Task.objects.create(title='Mine', owner=self.user, board=self.board)
+        theirs = Task.objects.create(title='Theirs', owner=self.other, board=self.board)
+        # Owning or collaborating on a task of a board one isn't a member of grants nothing
+        owned = Task.objects.create(title='Owned', owner=self.user, board=self.private)
+        shared = Task.objects.create(title='Shared', owner=self.other, board=self.private)
+        shared.collaborators.add(self.user)
+        Task.objects.create(title='No board', owner=self.user)
+
+        self.assertEqual(set(Task.objects.visible_to(self.user)), {mine, theirs})
+        self.assertEqual(list(Board.objects.visible_to(self.user)), [self.board])
+        for task in (owned, shared):
+            self.assertEqual(self.client.get(f'/api/tasks/{task.id}/').status_code, 404)
+            self.assertEqual(self.client.patch(f'/api/tasks/{task.id}/', {'status': 'done'}).status_code, 404)
+
+        Board.objects.filter(pk=self.board.pk).update(deleted_at=timezone.now())
+        self.assertFalse(Task.objects.visible_to(self.user).exists())
+        self.assertFalse(Board.objects.visible_to(self.user).exists())
+
+    def test_calendar_returns_each_task_once(self):
+        third = User.objects.create_user(username='carol', password='pass')
+        BoardMembership.objects.create(user=self.other, board=self.board)
+        both = Task.objects.create(title='Both', owner=self.user, board=self.board, start_date=date(2024, 1, 5))
+        both.collaborators.add(self.user, self.other, third)
+        collaborating = Task.objects.create(
+            title='Collaborating', owner=self.other, board=self.board, start_date=date(2024, 1, 6)
+        )
+        collaborating.collaborators.add(self.user, third)
+        Task.objects.create(title='Not mine', owner=self.other, board=self.board, start_date=date(2024, 1, 7))
+        hidden = Task.objects.create(title='Hidden', owner=self.user, board=self.private, start_date=date(2024, 1, 8))
+        hidden.collaborators.add(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/calendar/', {'start_date': '2024-01-01', 'end_date': '2024-01-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertCountEqual([task['id'] for task in response.data['results']], [both.id, collaborating.id])
+        self.assertFalse([q for q in queries if 'DISTINCT' in q['sql']])
+
+    @override_settings(BOARD_ROLES_CACHE_TIMEOUT=300)
+    def test_calendar_does_not_trust_the_roles_cache(self):
+        membership = BoardMembership.objects.create(user=self.user, board=self.private)
+        Task.objects.create(title='Theirs', owner=self.user, board=self.private, start_date=date(2024, 1, 8))
+        self.assertEqual(len(self.client.get('/api/tasks/calendar/').data['results']), 1)
+        request = APIRequestFactory().get('/')
+        request.user = self.user
+        get_board_roles(request)
+        # Removed by another process, whose invalidation this cache never sees
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM tasks_boardmembership WHERE id = %s', [membership.id])
+        self.assertEqual(self.client.get('/api/tasks/calendar/').data['results'], [])
+        self.assertEqual(self.client.get('/api/tasks/calendar/days/', {
+            'start_date': '2024-01-01', 'end_date': '2024-01-31',
+        }).data['days'], [])
+
+
+class CalendarTests(BoardTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tasks = {
+            title: Task.objects.create(title=title, owner=self.user, board=self.board, start_date=start, end_date=end)
+            for title, start, end in [
+                ('Before', date(2024, 1, 20), date(2024, 1, 31)),
+                ('Across', date(2024, 1, 30), date(2024, 2, 2)),
+                ('Inside', date(2024, 2, 10), date(2024, 2, 12)),
+                ('Due only', None, date(2024, 2, 29)),
+                ('Start only', date(2024, 2, 10), None),
+                ('Reversed', date(2024, 2, 3), date(2024, 2, 1)),
+                ('After', date(2024, 3, 1), date(2024, 3, 5)),
+                ('Undated', None, None),
+            ]
+        }
+
+    def titles(self, params):
+        response = self.client.get('/api/tasks/calendar/', params)
+        self.assertEqual(response.status_code, 200)
+        return {task['title'] for task in response.data['results']}
+
+    def test_window_matches_overlapping_tasks(self):
+        february = {'start_date': '2024-02-01', 'end_date': '2024-02-29'}
+        self.assertEqual(
+            self.titles(february), {'Across', 'Inside', 'Due only', 'Start only', 'Reversed'}
+        )
+        self.assertEqual(self.titles({'start_date': '2024-03-01'}), {'After'})
+        self.assertEqual(self.titles({'end_date': '2024-01-29'}), {'Before'})
+        self.assertEqual(len(self.titles({})), 8)
+
+    def test_single_day(self):
+        self.assertEqual(self.titles({'date': '2024-02-02'}), {'Across', 'Reversed'})
+        self.assertEqual(self.titles({'date': '2024-02-10'}), {'Inside', 'Start only'})
+        self.assertEqual(self.titles({'date': '2024-02-11'}), {'Inside'})
+
+    def test_invalid_parameters(self):
+        for params in (
+            {'date': 'tomorrow'},
+            {'date': '2024-02-01', 'start_date': '2024-02-01'},
+            {'start_date': '2024-02-02', 'end_date': '2024-02-01'},
+        ):
+            self.assertEqual(self.client.get('/api/tasks/calendar/', params).status_code, 400)
+
+    def test_day_counts(self):
+        other = User.objects.create_user(username='bob', password='pass')
+        BoardMembership.objects.create(user=other, board=self.board)
+        shared = Task.objects.create(
+            title='Shared', owner=other, board=self.board, start_date=date(2024, 2, 2), end_date=date(2024, 2, 3)
+        )
+        shared.collaborators.add(self.user, other)
+        Task.objects.create(title='Not mine', owner=other, board=self.board, start_date=date(2024, 2, 2))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/calendar/days/', {'start_date': '2024-01-31', 'end_date': '2024-02-03'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['days'], [
+            {'date': date(2024, 1, 31), 'count': 2},
+            {'date': date(2024, 2, 1), 'count': 2},
+            {'date': date(2024, 2, 2), 'count': 3},
+            {'date': date(2024, 2, 3), 'count': 2},
+        ])
+        self.assertEqual(len([q for q in queries if '"tasks_task"' in q['sql']]), 1)
+
+    def test_day_counts_window(self):
+        url = '/api/tasks/calendar/days/'
+        self.assertEqual(self.client.get(url, {'start_date': '2024-02-01'}).status_code, 400)
+        # At most 62 days, both ends included
+        too_long = {'start_date': '2024-01-01', 'end_date': '2024-03-03'}
+        self.assertEqual(self.client.get(url, too_long).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_date': '2024-01-01', 'end_date': '2024-03-02'}).status_code, 200)
+
+        loner = User.objects.create_user(username='carol', password='pass')
+        self.client.force_authenticate(loner)
+        response = self.client.get(url, {'start_date': '2024-02-01', 'end_date': '2024-02-29'})
+        self.assertEqual(response.data['days'], [])
+
+
+class BoardCounterTests(BoardTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+        self.second = Board.objects.create(name='Second', owner=self.user)
+        BoardMembership.objects.create(user=self.user, board=self.second, role='owner')
+
+    def counters(self, board=None):
+        fields = ['task_count', *Board.COUNTER_FIELDS]
+        return Board.objects.filter(pk=(board or self.board).pk).values(*fields).get()
+
+    def assertCounters(self, board=None, **expected):
+        counters = {field: 0 for field in ['task_count', *Board.COUNTER_FIELDS]}
+        counters['members_count'] = 1
+        counters.update(expected)
+        self.assertEqual(self.counters(board), counters)
+
+    def test_model_writes(self):
+        task = Task.objects.create(title='One', owner=self.user, board=self.board)
+        Task.objects.create(title='Two', owner=self.user, board=self.board, status='done')
+        self.assertCounters(task_count=2, todo_count=1, done_count=1)
+
+        task.status = 'in-progress'
+        task.save()
+        self.assertCounters(task_count=2, in_progress_count=1, done_count=1)
+        task.board = self.second
+        task.save()
+        self.assertCounters(task_count=1, done_count=1)
+        self.assertCounters(self.second, task_count=1, in_progress_count=1)
+        task.delete()
+        self.assertCounters(self.second)
+
+        membership = BoardMembership.objects.create(user=self.other, board=self.board)
+        invitation = BoardInvitation.objects.create(board=self.board, inviter=self.user, invitee_email='c@example.com')
+        self.assertCounters(task_count=1, done_count=1, members_count=2, pending_invitations_count=1)
+        BoardInvitation.objects.filter(pk=invitation.pk).update(status='accepted')
+        membership.delete()
+        self.assertCounters(task_count=1, done_count=1)
+
+    def test_bulk_paths(self):
+        tasks = self.create_tasks(4)
+        self.assertCounters(task_count=4, todo_count=4)
+        response = self.client.post('/api/tasks/bulk/', {
+            'create': [{'title': 'New', 'board_id': self.second.id, 'status': 'done'}],
+            'update': [{'id': tasks[0].id, 'status': 'done'}, {'id': tasks[1].id, 'board_id': self.second.id}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertCounters(task_count=3, todo_count=2, done_count=1)
+        self.assertCounters(self.second, task_count=2, todo_count=1, done_count=1)
+
+        Task.objects.filter(board=self.board).update(status='in-progress')
+        self.assertCounters(task_count=3, in_progress_count=3)
+        Task.objects.filter(board=self.second).delete()
+        self.assertCounters(self.second)
+
+        upload = SimpleUploadedFile('tasks.ndjson', b'{"title": "A"}\n{"title": "B", "status": "done"}\n')
+        response = self.client.post(f'/api/boards/{self.second.id}/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertCounters(self.second, task_count=2, todo_count=1, done_count=1)
+
+        self.client.delete(f'/api/boards/{self.board.id}/')
+        purge_board(self.board.id, batch_size=2, progress=lambda board_id, deleted: self.assertEqual(
+            self.counters()['task_count'], Task.objects.filter(board=self.board).count()
+        ))
+        self.assertFalse(Board.objects.filter(pk=self.board.pk).exists())
+
+    def test_saving_a_board_keeps_its_counters(self):
+        board = Board.objects.get(pk=self.board.pk)
+        self.create_tasks(2)
+        board.name = 'Renamed'
+        board.save()
+        self.assertCounters(task_count=2, todo_count=2)
+        self.assertEqual(Board.objects.get(pk=self.board.pk).name, 'Renamed')
+
+        response = self.client.post('/api/boards/', {'name': 'Third'})
+        self.assertEqual((response.data['members_count'], response.data['task_count']), (1, 0))
+
+    def test_serializers_read_the_columns(self):
+        self.create_tasks(2)
+        Task.objects.create(title='Done', owner=self.user, board=self.board, status='done')
+        BoardInvitation.objects.create(board=self.board, inviter=self.user, invitee_email='c@example.com')
+        for url in ('/api/boards/', f'/api/boards/{self.board.id}/'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            board = response.data[0] if isinstance(response.data, list) else response.data
+            self.assertEqual(
+                [board[field] for field in ('task_count', 'todo_count', 'done_count', 'members_count',
+                                            'pending_invitations_count')],
+                [3, 2, 1, 1, 1],
+            )
+            self.assertFalse([q for q in queries if '"tasks_task"' in q['sql']])
+
+    def test_reconcile(self):
+        self.create_tasks(3)
+        Board.objects.filter(pk=self.board.pk).update(todo_count=7, members_count=0)
+        out = StringIO()
+        call_command('reconcile_board_counters', stdout=out)
+        self.assertIn(f'Recounted board {self.board.id}', out.getvalue())
+        self.assertIn('1 board(s) recounted.', out.getvalue())
+        self.assertCounters(task_count=3, todo_count=3)
+
+        out = StringIO()
+        call_command('reconcile_board_counters', stdout=out)
+        self.assertIn('0 board(s) recounted.', out.getvalue())
+
+
+class QueryCountTests(BoardTestMixin, APITestCase):
+    """Rendering must cost the same number of queries for 2 rows as for 10."""
+
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username='bob', email='bob@example.com', password='pass')
+        BoardMembership.objects.create(user=self.other, board=self.board)
+
+    def add_rows(self, count):
+        for task in self.create_tasks(count, start_date=timezone.now().date()):
+            task.collaborators.add(self.other)
+        for i in range(count):
+            board = Board.objects.create(name=f'Other {i}', owner=self.other)
+            BoardMembership.objects.create(user=self.other, board=board, role='owner')
+            BoardInvitation.objects.create(
+                board=board, inviter=self.other, invitee_email=self.user.email
+            )
+
+    def assertConstantQueries(self, url):
+        self.add_rows(2)
+        with CaptureQueriesContext(connection) as baseline:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.add_rows(8)
+        with self.assertNumQueries(len(baseline)):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_task_list(self):
+        self.assertConstantQueries('/api/tasks/')
+
+    def test_task_detail(self):
+        task = self.create_tasks(1)[0]
+        task.collaborators.add(self.other)
+        self.assertConstantQueries(f'/api/tasks/{task.id}/')
+
+    def test_calendar(self):
+        self.assertConstantQueries('/api/tasks/calendar/')
+
+    def test_board_tasks(self):
+        self.assertConstantQueries(f'/api/boards/{self.board.id}/tasks/')
+
+    def test_invitation_list(self):
+        self.assertConstantQueries('/api/invitations/')
+
+    def test_my_invitations(self):
+        self.assertConstantQueries('/api/auth/invitations/')
+
+    @override_settings(BOARD_RESPONSE_CACHE_TIMEOUT=0)
+    def test_board_list(self):
+        self.add_rows(2)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/boards/')
+        self.assertEqual(response.data[0]['members_count'], 2)
+        self.add_rows(8)
+        self.create_tasks(3)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/boards/')
+        self.assertEqual(response.data[0]['task_count'], 13)
+
+    def test_user_search(self):
+        self.assertConstantQueries('/api/auth/search/?q=o')
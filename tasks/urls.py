@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet, BoardViewSet, BoardInvitationViewSet
+from .views import TaskViewSet, BoardViewSet, BoardInvitationViewSet, board_events
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='tasks')
@@ -8,5 +9,14 @@ router.register(r'boards', BoardViewSet, basename='boards')
 router.register(r'invitations', BoardInvitationViewSet, basename='invitations')
 
 urlpatterns = [
+    path('boards/<int:pk>/events/', board_events, name='board-events'),
+]
+
+if settings.ASYNC_READ_VIEWS:
+    # Read-heavy endpoints on the async ORM, for ASGI deployments
+    from .async_views import urlpatterns as async_urlpatterns
+    urlpatterns += async_urlpatterns
+
+urlpatterns += [
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,93 +1,446 @@
-from rest_framework import viewsets, permissions, status, filters
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import InvalidToken
+from users.authentication import CachedJWTAuthentication, get_cached_user
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection, models, transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from datetime import timedelta
 from .models import Task, Board, BoardMembership, BoardInvitation
-from .serializers import TaskSerializer, BoardSerializer, BoardInvitationSerializer
+from .serializers import (
+    TaskSerializer, BoardSerializer, BoardInvitationSerializer,
+    TaskValuesSerializer, BoardValuesSerializer, BoardInvitationValuesSerializer,
+    TaskBulkCreateSerializer, TaskBulkUpdateSerializer, TaskMoveSerializer, CalendarWindowSerializer,
+    FieldSelection,
+)
 from .permissions import IsOwnerOrReadOnly, IsBoardMemberOrReadOnly
+from .pagination import BoardTaskCursorPagination, TaskCursorPagination
+from .filters import TaskSearchFilter, TaskOrderingFilter
+from .membership import is_board_member, invalidate_board_roles
+from .purge import schedule_purge
+from .positions import assign_positions, move_task
+from .calendar import day_counts, on_day, overlapping
+from .export import aiter_chunks, stream_csv, stream_ndjson
+from .importer import IMPORT_FORMATS, TaskImporter, read_rows
+from .sync import DeltaSync, record_board_tombstones, record_task_moves
+from .events import (
+    board_channel, get_broker, issue_stream_ticket, publish_board_event, publish_task_events, redeem_stream_ticket,
+    stream_events,
+)
+from .conditional import CollectionValidators
+from .response_cache import (
+    board_detail_cache_key, board_list_cache_key, bump_board_versions, bump_task_boards,
+    get_cached_data, set_cached_data,
+)
 
-class TaskViewSet(viewsets.ModelViewSet):
+class FieldSelectionMixin:
+    """
+    ?fields= and ?expand= (see tasks.serializers.FieldSelection) for the read
+    actions in `sparse_actions`: the querysets load, and the serializers
+    render, only the selected fields.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def get_field_selection(self):
+        if self.action not in self.sparse_actions:
+            return None
+        return FieldSelection.from_request(self.request, self.get_serializer_class())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['field_selection'] = self.get_field_selection()
+        return context
+
+class TaskViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated, IsBoardMemberOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description']
-    ordering_fields = ['created_at', 'updated_at', 'priority', 'status', 'start_date', 'end_date']
+    filter_backends = [TaskSearchFilter, TaskOrderingFilter]
+    ordering_fields = ['created_at', 'updated_at', 'priority', 'status', 'position', 'start_date', 'end_date']
     ordering = ['-created_at']
+    pagination_class = TaskCursorPagination
+    bulk_max_items = 1000
+    bulk_batch_size = 500
+    sync_limit = 500
+    sync_max_limit = 2000
+    sparse_actions = ('list', 'retrieve', 'calendar')
+    calendar_max_days = 62
     
     def get_queryset(self):
+        queryset = Task.objects.visible_to(self.request.user)
+        return TaskSerializer.setup_eager_loading(queryset, self.get_field_selection())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = CollectionValidators(request, queryset)
+        not_modified = validators.not_modified()
+        if not_modified is not None:
+            return not_modified
+
+        selection = self.get_field_selection()
+        page = self.paginate_queryset(TaskValuesSerializer.values(queryset, selection))
+        serializer = TaskValuesSerializer(page, many=True, context=self.get_serializer_context(), selection=selection)
+        return validators.apply(self.get_paginated_response(serializer.data))
+
+    def get_calendar_window(self):
+        params = CalendarWindowSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data
+
+    def get_calendar_tasks(self):
+        """Tasks the user can see and owns or collaborates on"""
+        # The rows of Task.objects.visible_to(), scoped by the ids of
+        # Board.objects.visible_to() loaded first: against a list of ids
+        # PostgreSQL combines one board index scan with one span index scan,
+        # where the EXISTS semi-join repeats the span index scan for every board.
         user = self.request.user
-        return Task.objects.filter(board__memberships__user=user).distinct()
+        board_ids = list(Board.objects.visible_to(user).values_list('id', flat=True))
+        return Task.objects.filter(board_id__in=board_ids).involving(user)
+
+    def get_calendar_queryset(self):
+        """
+        Calendar tasks on ?date=, or on any day from ?start_date= to ?end_date=
+        """
+        window = self.get_calendar_window()
+        queryset = self.get_calendar_tasks()
+        if 'date' in window:
+            queryset = on_day(queryset, window['date'])
+        elif window:
+            queryset = overlapping(queryset, window.get('start_date'), window.get('end_date'))
+        return TaskSerializer.setup_eager_loading(queryset, self.get_field_selection())
 
     @action(detail=False, methods=['get'])
     def calendar(self, request):
         """
         Get tasks for calendar view with date filtering
         """
-        user = request.user
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        
-        queryset = Task.objects.filter(
-            models.Q(owner=user) | models.Q(collaborators=user)
-        )
-        
-        if start_date:
-            queryset = queryset.filter(start_date__gte=start_date)
-        
-        if end_date:
-            queryset = queryset.filter(start_date__lte=end_date)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.get_calendar_queryset()
+        validators = CollectionValidators(request, queryset)
+        not_modified = validators.not_modified()
+        if not_modified is not None:
+            return not_modified
+
+        selection = self.get_field_selection()
+        page = self.paginate_queryset(TaskValuesSerializer.values(queryset, selection))
+        serializer = TaskValuesSerializer(page, many=True, context=self.get_serializer_context(), selection=selection)
+        return validators.apply(self.get_paginated_response(serializer.data))
     
+    @action(detail=False, methods=['get'], url_path='calendar/days')
+    def calendar_days(self, request):
+        """
+        Number of calendar tasks on each day from ?start_date= to ?end_date=, for month views
+        """
+        window = self.get_calendar_window()
+        if 'start_date' not in window or 'end_date' not in window:
+            return Response({"error": "start_date and end_date are required."}, status=status.HTTP_400_BAD_REQUEST)
+        start, end = window['start_date'], window['end_date']
+        if (end - start).days >= self.calendar_max_days:
+            return Response(
+                {"error": f"At most {self.calendar_max_days} days can be counted at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        days = day_counts(self.get_calendar_tasks(), start, end)
+        return Response({
+            'start_date': start,
+            'end_date': end,
+            'days': [{'date': day, 'count': count} for day, count in days],
+        })
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create and partially update many tasks in a single transaction.
+
+        Expects {"create": [...], "update": [{"id": ..., ...}, ...]}. If any item
+        is invalid nothing is written and the per-item errors are returned in
+        the same positions as the submitted items.
+        """
+        creates = request.data.get('create', [])
+        updates = request.data.get('update', [])
+        if not isinstance(creates, list) or not isinstance(updates, list):
+            return Response({"error": "'create' and 'update' must be lists."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(creates) + len(updates) > self.bulk_max_items:
+            return Response(
+                {"error": f"At most {self.bulk_max_items} items can be submitted at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        context = self.get_serializer_context()
+        create_errors, new_tasks = [], []
+        for item in creates:
+            serializer = TaskBulkCreateSerializer(data=item, context=context)
+            if serializer.is_valid():
+                create_errors.append({})
+                new_tasks.append(Task(owner=request.user, **serializer.validated_data))
+            else:
+                create_errors.append(serializer.errors)
+
+        update_errors, changes = [], []
+        for item in updates:
+            serializer = TaskBulkUpdateSerializer(data=item, partial=True, context=context)
+            if serializer.is_valid():
+                update_errors.append({})
+                changes.append(serializer.validated_data)
+            else:
+                update_errors.append(serializer.errors)
+                changes.append(None)
+
+        # Load every targeted task in one query and check permissions set-wise
+        ids = [change['id'] for change in changes if change]
+        tasks = self.get_queryset().in_bulk(ids)
+        seen = set()
+        for index, change in enumerate(changes):
+            if change is None:
+                continue
+            task = tasks.get(change['id'])
+            if task is None:
+                update_errors[index] = {'id': ['Task not found.']}
+            elif change['id'] in seen:
+                update_errors[index] = {'id': ['Task is listed more than once.']}
+            elif not all(p.has_object_permission(request, self, task) for p in self.get_permissions()):
+                update_errors[index] = {'id': ['You do not have permission to edit this task.']}
+            seen.add(change['id'])
+
+        if any(create_errors) or any(update_errors):
+            return Response({'create': create_errors, 'update': update_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        fields = {'updated_at'}
+        for change in changes:
+            task = tasks[change['id']]
+            for field, value in change.items():
+                setattr(task, field, value)
+            task.updated_at = now
+            fields.update(field for field in change if field != 'id')
+        # New tasks, and tasks moved to another column, go to the bottom of it
+        assign_positions(new_tasks)
+        if assign_positions(tasks.values()):
+            fields.add('position')
+
+        with transaction.atomic():
+            created = Task.objects.bulk_create(new_tasks, batch_size=self.bulk_batch_size)
+            Task.objects.bulk_update(
+                [tasks[change['id']] for change in changes], sorted(fields), batch_size=self.bulk_batch_size
+            )
+            # bulk_create/bulk_update send no post_save; announce the changes here
+            publish_task_events(created, 'task.created')
+            publish_task_events(tasks.values(), 'task.updated')
+            bump_task_boards(created, created=True)
+            bump_task_boards(tasks.values())
+            record_task_moves(tasks.values())
+
+        # Attach boards and collaborators for the nested output in bulk
+        updated = [tasks[pk] for pk in ids]
+        boards = Board.objects.in_bulk({task.board_id for task in created + updated if task.board_id})
+        for task in created + updated:
+            task.board = boards.get(task.board_id)
+        models.prefetch_related_objects(created, 'collaborators')
+
+        return Response({
+            'created': self.get_serializer(created, many=True).data,
+            'updated': self.get_serializer(updated, many=True).data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """
+        Tasks and boards changed since ?cursor=, plus the ids of deleted tasks and
+        of boards the user lost access to. Omit the cursor for a full sync, then
+        pass back the returned cursor; repeat while has_more is true.
+        """
+        try:
+            limit = min(int(request.query_params.get('limit', self.sync_limit)), self.sync_max_limit)
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(DeltaSync(request, max(limit, 1)).get_data(self.get_serializer_context()))
+
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        """
+        Move a card on its board: into the `status` column (default: its own),
+        right after the card `after_id` and/or right before `before_id`, or to
+        the bottom of the column without either.
+        """
+        task = self.get_object()
+        serializer = TaskMoveSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            move_task(task, **serializer.validated_data)
+        except Task.DoesNotExist:
+            return Response(
+                {"error": "after_id and before_id must be tasks of the target column."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(task).data)
+
     @action(detail=True, methods=['post'])
     def add_collaborator(self, request, pk=None):
         task = self.get_object()
-        if not BoardMembership.objects.filter(user=request.user, board=task.board).exists():
+        if not is_board_member(request, task.board_id):
             return Response({"error": "Only board members can add collaborators"}, status=status.HTTP_403_FORBIDDEN)
 
         try:
             user_id = request.data.get('user_id')
             user = User.objects.get(id=user_id)
             task.collaborators.add(user)
+            # Bump updated_at so collection validators see the change
+            task.save(update_fields=['updated_at'])
             return Response({'status': 'collaborator added'})
         except User.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class BoardViewSet(viewsets.ModelViewSet):
+class BoardViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = BoardSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
     queryset = Board.objects.all()
+    export_chunk_size = 2000
+    import_batch_size = 1000
+    tasks_pagination_class = BoardTaskCursorPagination
     
     def get_queryset(self):
-        return Board.objects.filter(memberships__user=self.request.user).distinct()
+        queryset = Board.objects.visible_to(self.request.user)
+        return BoardSerializer.setup_eager_loading(queryset, self.get_field_selection())
     
+    def list(self, request, *args, **kwargs):
+        # Served from the versioned response cache while no board of the user,
+        # nor their memberships, changed (see tasks.response_cache)
+        key = board_list_cache_key(request)
+        data = get_cached_data(key)
+        if data is not None:
+            return Response(data)
+        selection = self.get_field_selection()
+        boards = BoardValuesSerializer.values(self.filter_queryset(self.get_queryset()), selection)
+        serializer = BoardValuesSerializer(boards, many=True, context=self.get_serializer_context(), selection=selection)
+        response = Response(serializer.data)
+        set_cached_data(key, response)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        key = board_detail_cache_key(request, kwargs.get('pk'))
+        data = get_cached_data(key)
+        if data is not None:
+            return Response(data)
+        response = super().retrieve(request, *args, **kwargs)
+        set_cached_data(key, response)
+        return response
+
     def destroy(self, request, *args, **kwargs):
         board = self.get_object()
         
-        # Delete all related objects explicitly
-        board.board_tasks.all().delete()  # Delete all tasks under the board
-        board.memberships.all().delete()  # Delete all board memberships
-        board.invitations.all().delete()  # Delete all pending invitations
-        
-        board.delete()  # Finally, delete the board itself
+        # Hide the board right away; its tasks, memberships and invitations are
+        # purged in batches afterwards (see tasks.purge and purge_deleted_boards)
+        with transaction.atomic():
+            Board.objects.filter(pk=board.pk).update(deleted_at=timezone.now())
+            member_ids = list(board.memberships.values_list('user_id', flat=True))
+            record_board_tombstones(board.pk, member_ids)
+            publish_board_event(board.pk, 'board.deleted')
+            invalidate_board_roles(*member_ids)
+            transaction.on_commit(lambda: invalidate_board_roles(*member_ids))
+            bump_board_versions([board.pk], member_ids)
+            schedule_purge(board.pk)
         
-        return Response({"message": "Board and all related data deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
+        return Response({"message": "Board deleted. Its data is being removed in the background."}, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=True, methods=['get'])
     def tasks(self, request, pk=None):
         """
-        Get all tasks for a specific board
+        Get all tasks for a specific board in Kanban order (by status, then
+        position), with the task ?fields= and ?expand=
         """
         board = self.get_object()
         tasks = board.board_tasks.all()
-        serializer = TaskSerializer(tasks, many=True, context={'request': request})
-        return Response(serializer.data)
+        validators = CollectionValidators(request, tasks)
+        not_modified = validators.not_modified()
+        if not_modified is not None:
+            return not_modified
+
+        selection = FieldSelection.from_request(request, TaskSerializer)
+        paginator = self.tasks_pagination_class()
+        page = paginator.paginate_queryset(TaskValuesSerializer.values(tasks, selection), request, view=self)
+        serializer = TaskValuesSerializer(page, many=True, context={'request': request}, selection=selection)
+        return validators.apply(paginator.get_paginated_response(serializer.data))
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """
+        Stream every task of a board as NDJSON (default) or CSV (?export_format=csv)
+        """
+        board = self.get_object()
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format == 'ndjson':
+            content = stream_ndjson(board.board_tasks.all(), self.get_serializer_context(), self.export_chunk_size)
+            content_type = 'application/x-ndjson'
+        elif export_format == 'csv':
+            content = stream_csv(board.board_tasks.all(), self.export_chunk_size)
+            content_type = 'text/csv'
+        else:
+            return Response(
+                {"error": "export_format must be 'ndjson' or 'csv'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_chunks(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="board-{board.pk}-tasks.{export_format}"'
+        return response
+
+    @action(detail=True, methods=['post'], url_path='events/ticket', permission_classes=[permissions.IsAuthenticated])
+    def events_ticket(self, request, pk=None):
+        """
+        A single-use ticket for opening the board's event stream with
+        ?ticket=, for clients such as EventSource that cannot send headers
+        """
+        board = self.get_object()
+        return Response({
+            'ticket': issue_stream_ticket(request.user, board.pk),
+            'expires_in': settings.EVENT_STREAM_TICKET_SECONDS,
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'], url_path='import', permission_classes=[permissions.IsAuthenticated])
+    def import_tasks(self, request, pk=None):
+        """
+        Create tasks from an uploaded CSV or NDJSON file (multipart field `file`).
+        The format follows ?import_format= or the file extension. Nothing is
+        imported if a row is invalid, unless ?partial=true.
+        """
+        board = self.get_object()
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload the tasks as a 'file' field."}, status=status.HTTP_400_BAD_REQUEST)
+
+        import_format = request.query_params.get('import_format') or upload.name.rsplit('.', 1)[-1].lower()
+        if import_format == 'jsonl':
+            import_format = 'ndjson'
+        if import_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": "import_format must be 'ndjson' or 'csv'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-class BoardInvitationViewSet(viewsets.ModelViewSet):
+        importer = TaskImporter(
+            board, request.user,
+            batch_size=self.import_batch_size,
+            partial=request.query_params.get('partial', '').lower() == 'true',
+        )
+        try:
+            result = importer.run(read_rows(upload, import_format))
+        except UnicodeDecodeError:
+            # Raised mid-file; the import's transaction is rolled back
+            return Response({"error": "The file must be UTF-8 encoded."}, status=status.HTTP_400_BAD_REQUEST)
+        if result['errors'] and not result['created']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+class BoardInvitationViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = BoardInvitationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -96,7 +449,16 @@ class BoardInvitationViewSet(viewsets.ModelViewSet):
         Return invitations where the user is the inviter or the invitee.
         """
         user = self.request.user
-        return BoardInvitation.objects.filter(models.Q(inviter=user) | models.Q(invitee_email=user.email))
+        queryset = BoardInvitation.objects.filter(
+            models.Q(inviter=user) | models.Q(invitee_email=user.email),
+            board__deleted_at__isnull=True,
+        )
+        return BoardInvitationSerializer.setup_eager_loading(queryset, self.get_field_selection())
+
+    def list(self, request, *args, **kwargs):
+        selection = self.get_field_selection()
+        invitations = BoardInvitationValuesSerializer.values(self.filter_queryset(self.get_queryset()), selection)
+        return Response(BoardInvitationValuesSerializer(invitations, many=True, selection=selection).data)
     
     @action(detail=False, methods=['post'])
     def invite(self, request):
@@ -116,7 +478,7 @@ class BoardInvitationViewSet(viewsets.ModelViewSet):
 
         # Ensure the board exists and the inviter is allowed to send invites
         try:
-            board = Board.objects.get(id=board_id)
+            board = Board.objects.active().get(id=board_id)
         except Board.DoesNotExist:
             return Response(
                 {"error": "Board not found."},
@@ -124,7 +486,7 @@ class BoardInvitationViewSet(viewsets.ModelViewSet):
             )
 
         # Ensure inviter is a board member
-        if not BoardMembership.objects.filter(board=board, user=user).exists():
+        if not is_board_member(request, board.id):
             return Response(
                 {"error": "You do not have permission to invite users to this board."},
                 status=status.HTTP_403_FORBIDDEN
@@ -164,4 +526,62 @@ class BoardInvitationViewSet(viewsets.ModelViewSet):
             return Response(
                 {"message": "Invitation sent successfully."},
                 status=status.HTTP_201_CREATED
-            )
\ No newline at end of file
+            )
+
+@sync_to_async(thread_sensitive=False)
+def authorize_board_stream(request, pk):
+    """
+    Return the user of the Authorization header or of ?ticket= if they are a
+    member of the board, None if not. Runs in the shared thread pool and
+    closes its database connection, so open streams hold neither a thread nor
+    a connection while idle.
+    """
+    authenticator = CachedJWTAuthentication()
+    try:
+        header = authenticator.get_header(request)
+        if header is None:
+            user_id = redeem_stream_ticket(request.GET.get('ticket'), pk)
+            user = get_cached_user(user_id) if user_id else None
+            if user is None or not user.is_active:
+                raise AuthenticationFailed()
+        else:
+            raw_token = authenticator.get_raw_token(header)
+            if not raw_token:
+                raise AuthenticationFailed()
+            user = authenticator.get_user(authenticator.get_validated_token(raw_token))
+        is_member = BoardMembership.objects.filter(
+            user=user, board_id=pk, board__deleted_at__isnull=True
+        ).exists()
+        return user if is_member else None
+    finally:
+        connection.close()
+
+
+async def board_events(request, pk):
+    """
+    Server-Sent Events stream of a board's task and membership changes.
+
+    A plain async view rather than a DRF action, so that under ASGI an idle
+    stream costs a coroutine instead of a worker thread. Browsers' EventSource
+    cannot send headers; it passes a ticket from events_ticket as ?ticket=.
+    """
+    try:
+        user = await authorize_board_stream(request, pk)
+    except (AuthenticationFailed, InvalidToken):
+        return JsonResponse({
+            'error': 'Authentication Error',
+            'message': 'Invalid or expired token. Please login again.',
+            'status': 'error'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    if user is None:
+        return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    broker = get_broker()
+    subscription = broker.subscribe(board_channel(pk))
+    response = StreamingHttpResponse(
+        stream_events(broker, subscription, user.id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
+from .authentication import deactivate_users
 from .models import Profile
 
 @admin.register(Profile)
@@ -6,3 +9,15 @@ class ProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'created_at', 'updated_at')
     search_fields = ('user__username', 'user__email')
 
+
+@admin.action(description='Deactivate selected users')
+def deactivate(modeladmin, request, queryset):
+    # Through deactivate_users(), so their cached rows stop authenticating
+    deactivate_users(queryset)
+
+
+admin.site.unregister(User)
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    actions = [deactivate]
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# Enough for permission checks, ownership filters and the user serializers;
+# anything else (password, last_login, ...) is deferred and loaded on access.
+# In the model's field order, as Model.from_db() expects.
+CACHED_USER_FIELDS = ('id', 'is_superuser', 'username', 'first_name', 'last_name', 'email', 'is_staff', 'is_active')
+
+
+def _cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def get_cached_user(user_id):
+    """
+    Return the user with `user_id`, or None, built from the cache when
+    possible. Only CACHED_USER_FIELDS are loaded; the row is cached for
+    AUTH_USER_CACHE_TIMEOUT seconds and dropped whenever the user is saved,
+    deleted (see users.models) or deactivated with deactivate_users().
+    """
+    timeout = settings.AUTH_USER_CACHE_TIMEOUT
+    values = cache.get(_cache_key(user_id)) if timeout else None
+    if values is None:
+        values = User.objects.filter(pk=user_id).values_list(*CACHED_USER_FIELDS).first()
+        if values is None:
+            return None
+        if timeout:
+            cache.set(_cache_key(user_id), values, timeout)
+    return User.from_db(User.objects.db, CACHED_USER_FIELDS, values)
+
+
+def invalidate_cached_users(*user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+    # A concurrent request may re-cache the old row before we commit.
+    transaction.on_commit(lambda: cache.delete_many([_cache_key(user_id) for user_id in user_ids]))
+
+
+def deactivate_users(users):
+    """
+    Deactivate a queryset of users and drop their cached rows, which a plain
+    update() would leave to authenticate until they expire. Returns the
+    number of users deactivated.
+    """
+    user_ids = list(users.filter(is_active=True).values_list('pk', flat=True))
+    if not user_ids:
+        return 0
+    deactivated = User.objects.filter(pk__in=user_ids).update(is_active=False)
+    invalidate_cached_users(*user_ids)
+    return deactivated
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request user query: the user comes from
+    get_cached_user(), so most requests authenticate without touching the
+    database.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which is never cached
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
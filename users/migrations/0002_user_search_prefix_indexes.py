@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# Expression indexes matching the SQL Django emits for `__istartswith` on
+# PostgreSQL (`UPPER("col"::text) LIKE UPPER('q%')`), so typeahead prefix
+# lookups on auth_user are index range scans instead of sequential scans.
+PREFIX_INDEXES = {
+    "user_username_prefix_idx": "username",
+    "user_email_prefix_idx": "email",
+    "user_first_name_prefix_idx": "first_name",
+    "user_last_name_prefix_idx": "last_name",
+}
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("users", "0001_initial"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON "auth_user" (UPPER("{column}"::text) text_pattern_ops);',
+            reverse_sql=f'DROP INDEX CONCURRENTLY IF EXISTS "{name}";',
+        )
+        for name, column in PREFIX_INDEXES.items()
+    ]
@@ -1,3 +1,89 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from tasks.models import Board, BoardMembership
+from .authentication import deactivate_users, get_cached_user
+
+
+class UserTypeaheadTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='caller', email='caller@example.com', password='pass')
+        self.client.force_authenticate(self.user)
+
+    def search(self, query, **params):
+        response = self.client.get('/api/auth/search/', {'q': query, 'typeahead': '1', **params})
+        self.assertEqual(response.status_code, 200)
+        return [user['username'] for user in response.data]
+
+    def test_minimum_query_length(self):
+        User.objects.create_user(username='jo')
+        self.assertEqual(self.search('j'), [])
+
+    def test_ranks_exact_then_username_then_other_matches(self):
+        User.objects.create_user(username='zed', first_name='Jon')
+        User.objects.create_user(username='jonathan')
+        User.objects.create_user(username='jon')
+        User.objects.create_user(username='jonny')
+        self.assertEqual(self.search('jon'), ['jon', 'jonny', 'jonathan', 'zed'])
+
+    def test_full_name_prefix(self):
+        User.objects.create_user(username='jd', first_name='Jane', last_name='Doe')
+        User.objects.create_user(username='jx', first_name='Jane', last_name='Xu')
+        self.assertEqual(self.search('jane do'), ['jd'])
+
+    def test_result_cap_and_inactive_users(self):
+        for i in range(15):
+            User.objects.create_user(username=f'sam{i}')
+        User.objects.create_user(username='samantha', is_active=False)
+        results = self.search('sam')
+        self.assertEqual(len(results), 10)
+        self.assertNotIn('samantha', results)
+
+    def test_restrict_to_shared_boards(self):
+        teammate = User.objects.create_user(username='ann-team')
+        User.objects.create_user(username='ann-stranger')
+        board = Board.objects.create(name='Team', owner=self.user)
+        BoardMembership.objects.create(user=self.user, board=board, role='owner')
+        BoardMembership.objects.create(user=teammate, board=board)
+        self.assertEqual(self.search('ann', shared_boards='true'), ['ann-team'])
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+class CachedAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='caller', email='caller@example.com', password='pass')
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_user_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/auth/me/').data['username'], 'caller')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/auth/me/').data['email'], 'caller@example.com')
+
+    def test_saving_the_user_invalidates(self):
+        self.client.get('/api/auth/me/')
+        self.user.first_name = 'Cal'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/me/').data['first_name'], 'Cal')
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 401)
+
+    def test_bulk_deactivation_invalidates(self):
+        self.client.get('/api/auth/me/')
+        self.assertEqual(deactivate_users(User.objects.filter(username='caller')), 1)
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 401)
+
+    def test_cached_user_defers_the_rest(self):
+        user = get_cached_user(self.user.id)
+        self.assertEqual(user.get_deferred_fields(), {'password', 'last_login', 'date_joined'})
+        # Saving it must not blank the fields it never loaded
+        user.first_name = 'Cal'
+        user.save()
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('pass'))
@@ -1,10 +1,12 @@
+from django.conf import settings
 from django.urls import path
+from tasks.async_views import read_async
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
 from .views import (
-    RegisterView, UserDetailView, ProfileView,  UserSearchView, my_invitations
+    RegisterView, UserDetailView, ProfileView,  UserSearchView, my_invitations, my_invitations_async
 )
 
 urlpatterns = [
@@ -14,5 +16,5 @@ urlpatterns = [
     path('me/', UserDetailView.as_view(), name='user-detail'),
     path('profile/', ProfileView.as_view(), name='user-profile'),
     path('search/', UserSearchView.as_view(), name='user-search'),
-    path('invitations/', my_invitations, name='my-invitations'),
+    path('invitations/', read_async(my_invitations_async, my_invitations) if settings.ASYNC_READ_VIEWS else my_invitations, name='my-invitations'),
 ]
\ No newline at end of file
@@ -1,14 +1,17 @@
+from asgiref.sync import sync_to_async
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models.functions import Length
 from .serializers import (
     UserSerializer, RegisterSerializer, ProfileSerializer, 
 )
 from .models import Profile
-from tasks.models import BoardInvitation
+from tasks.async_views import async_read
+from tasks.models import Board, BoardInvitation, BoardMembership
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -27,14 +30,18 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return Profile.objects.get(user=self.request.user)
+        return Profile.objects.select_related('user').get(user=self.request.user)
 
 class UserSearchView(generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    typeahead_min_length = 2
+    typeahead_limit = 10
     
     def get_queryset(self):
         query = self.request.query_params.get('q', '')
+        if self.request.query_params.get('typeahead', '').lower() in ('1', 'true'):
+            return self.get_typeahead_queryset(query.strip())
         if query:
             return User.objects.filter(
                 models.Q(username__icontains=query) | 
@@ -44,17 +51,77 @@ class UserSearchView(generics.ListAPIView):
             )
         return User.objects.none()
 
+    def get_typeahead_queryset(self, query):
+        """
+        Prefix matching for the invite dialog, served by the prefix indexes on
+        auth_user. Capped and ranked so each keystroke is a bounded lookup.
+        """
+        if len(query) < self.typeahead_min_length:
+            return User.objects.none()
+
+        matches = (
+            models.Q(username__istartswith=query) |
+            models.Q(email__istartswith=query) |
+            models.Q(first_name__istartswith=query) |
+            models.Q(last_name__istartswith=query)
+        )
+        first_name, _, last_name = query.partition(' ')
+        if last_name.strip():
+            # "Jane Do" matches first and last name together
+            matches |= models.Q(first_name__istartswith=first_name, last_name__istartswith=last_name.strip())
+
+        queryset = User.objects.filter(matches, is_active=True)
+
+        if self.request.query_params.get('shared_boards', '').lower() in ('1', 'true'):
+            queryset = queryset.filter(models.Exists(BoardMembership.objects.filter(
+                user=models.OuterRef('pk'),
+                board__in=Board.objects.visible_to(self.request.user),
+            )))
+
+        # Exact matches first, then username completions, then anything else;
+        # within a tier the shortest (most similar) completion wins.
+        match_rank = models.Case(
+            models.When(models.Q(username__iexact=query) | models.Q(email__iexact=query), then=0),
+            models.When(username__istartswith=query, then=1),
+            default=2,
+        )
+        return queryset.annotate(match_rank=match_rank).order_by(
+            'match_rank', Length('username'), 'id'
+        )[:self.typeahead_limit]
+
+def pending_invitations(user, selection=None):
+    """
+    Pending invitations addressed to the user, with inviter and board joined
+    """
+    from tasks.serializers import BoardInvitationSerializer
+
+    return BoardInvitationSerializer.setup_eager_loading(BoardInvitation.objects.filter(
+        invitee_email=user.email,
+        status='pending',
+        board__deleted_at__isnull=True,
+    ), selection)
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def my_invitations(request):
     """
-    Get all pending invitations for the current user
+    Get all pending invitations for the current user, with the invitation
+    ?fields= and ?expand=
     """
-    invitations = BoardInvitation.objects.filter(
-        invitee_email=request.user.email,
-        status='pending'
-    )
-    
-    from tasks.serializers import BoardInvitationSerializer
-    serializer = BoardInvitationSerializer(invitations, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    from tasks.serializers import BoardInvitationSerializer, BoardInvitationValuesSerializer, FieldSelection
+
+    selection = FieldSelection.from_request(request, BoardInvitationSerializer)
+    invitations = BoardInvitationValuesSerializer.values(pending_invitations(request.user, selection), selection)
+    return Response(BoardInvitationValuesSerializer(invitations, many=True, selection=selection).data)
+
+@async_read(my_invitations.cls)
+async def my_invitations_async(view, request):
+    """
+    my_invitations with the async ORM, served when ASYNC_READ_VIEWS is on
+    """
+    from tasks.serializers import BoardInvitationSerializer, BoardInvitationValuesSerializer, FieldSelection
+
+    selection = FieldSelection.from_request(request, BoardInvitationSerializer)
+    invitations = BoardInvitationValuesSerializer.values(pending_invitations(request.user, selection), selection)
+    serializer = BoardInvitationValuesSerializer([row async for row in invitations], many=True, selection=selection)
+    return Response(await sync_to_async(lambda: serializer.data)())